@@ -0,0 +1,22 @@
+""" Description: This file runs the policy generator or the driver when the directory is run with
+    "python <directory> policies" or "python <directory> driver" (with neither, it asks which one).
+    Only the program that is run is imported, and neither program asks for input, creates an engine,
+    or connects to a database when it is imported, so their functions (for example checkABAC or
+    createView) can also be imported on their own by a benchmark or a worker process.
+"""
+
+import sys
+
+#runs the program that is named on the command line or picked
+def main():
+    program = sys.argv[1] if len(sys.argv) > 1 else input("Pick program: 1. Policy generator, 2. Driver\n")
+    if program == "1" or program == "policies":
+        import policies
+        policies.main()
+    elif program == "2" or program == "driver":
+        import driver
+        driver.main()
+    else:
+        print("unknown program " + program + ", pick policies or driver")
+
+main()
@@ -0,0 +1,120 @@
+""" Description: This file builds a Bloom filter over the policies of each access control database so that
+    the driver can tell, without asking the database, that a permission has no policy for a principal.
+    The keys are the permissions that have abac policies, the (user, permission) pairs of the rbac
+    policies of every role that a user has directly or through the role hierarchy, and the (purpose,
+    permission) pairs of the pbac policies of every purpose and the purposes above it. A Bloom filter
+    never says that a key is missing when it was added, so skipping the lookups that it rejects does not
+    change any decision; it can say that a missing key may be there, which only costs the lookup that
+    would have been made anyway. The filter is saved with the checksums of the tables it was built from,
+    so a filter that is older than the policies is rebuilt instead of used.
+"""
+
+import hashlib
+import json
+import math
+import struct
+from sqlalchemy import text
+from backend import isEmbedded
+
+#the first bytes of every filter file and the version of the layout
+filterMagic = b"ACBLOOM\0"
+filterVersion = 1
+headerFormat = "<8sIQIQI"
+
+#the query that returns the keys of each database's filter and the tables that the keys come from
+keyQueries = {"abac": "SELECT DISTINCT permission, '' FROM policy WHERE permission IS NOT NULL;",
+              "rbac": "SELECT DISTINCT a.u_name, p.permission FROM assignment a JOIN role_closure c ON c.senior = a.r_name JOIN policy p ON p.r_name = c.junior;",
+              "pbac": "SELECT DISTINCT u.p_name, p.permission FROM purpose u JOIN purpose q ON q.lft <= u.lft AND u.rgt <= q.rgt JOIN policy p ON p.purpose = q.p_name;"}
+keyTables = {"abac": ["policy"], "rbac": ["policy", "assignment", "role_closure"], "pbac": ["policy", "purpose"]}
+
+#returns the key of a permission for a principal in the given database's filter; the keys are
+#compared exactly, so names must be given with the same case as they are stored
+def filterKey(database, principal, permission):
+    if database == "abac":
+        return permission
+    return principal + "\0" + permission
+
+class BloomFilter:
+    def __init__(self, bits, hashes, count=0, data=None):
+        self.bits = bits
+        self.hashes = hashes
+        self.count = count
+        self.data = data if data != None else bytearray((bits + 7) // 8)
+
+    #returns the bit positions of a key, using two halves of one hash (double hashing)
+    def positions(self, key):
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1, h2 = struct.unpack("<QQ", digest)
+        return [(h1 + i * h2) % self.bits for i in range(self.hashes)]
+
+    def add(self, key):
+        for position in self.positions(key):
+            self.data[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    #returns False if the key was definitely not added and True if it may have been
+    def mayContain(self, key):
+        for position in self.positions(key):
+            if not self.data[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+    #returns the expected false positive rate for the number of keys that were added
+    def expectedRate(self):
+        return (1 - math.exp(-self.hashes * self.count / self.bits)) ** self.hashes
+
+#returns an empty filter sized for the number of keys and the false positive rate
+def sizedFilter(count, rate):
+    count = max(count, 1)
+    bits = max(8, int(math.ceil(-count * math.log(rate) / (math.log(2) ** 2))))
+    hashes = max(1, int(round(bits / count * math.log(2))))
+    return BloomFilter(bits, hashes)
+
+#returns the checksums of the tables that the filter of the given database is built from;
+#the embedded backends have no CHECKSUM TABLE, so their rows are hashed here in sorted order
+def getChecksums(conn, database):
+    checksums = {}
+    if isEmbedded():
+        for table in keyTables[database]:
+            rows = sorted([repr(tuple(row)) for row in conn.execute(text("SELECT * FROM {};".format(table)))])
+            checksums[table] = int(hashlib.sha1("\n".join(rows).encode("utf-8")).hexdigest()[:15], 16)
+        return checksums
+    result = conn.execute(text("CHECKSUM TABLE {};".format(", ".join(keyTables[database]))))
+    for row in result:
+        checksums[row[0].split(".")[-1]] = row[1]
+    return checksums
+
+#builds the filter of the database that the connection uses; returns the filter and the
+#checksums of the tables that it was built from
+def buildFilter(conn, database, rate=0.01):
+    checksums = getChecksums(conn, database)
+    result = conn.execute(text(keyQueries[database]))
+    keys = [filterKey(database, row[0], row[1]) for row in result]
+    bloom = sizedFilter(len(keys), rate)
+    for key in keys:
+        bloom.add(key)
+    return bloom, checksums
+
+#writes a filter and its checksums to a file
+def saveFilter(bloom, checksums, filename):
+    header = json.dumps({"checksums": checksums}, sort_keys=True).encode("utf-8")
+    f = open(filename, "wb")
+    f.write(struct.pack(headerFormat, filterMagic, filterVersion, bloom.bits, bloom.hashes, bloom.count, len(header)))
+    f.write(header)
+    f.write(bytes(bloom.data))
+    f.close()
+
+#reads a filter file; returns the filter and the checksums it was built from, or raises
+#a ValueError if the file is not a filter or has another layout version
+def loadFilter(filename):
+    f = open(filename, "rb")
+    data = f.read()
+    f.close()
+    size = struct.calcsize(headerFormat)
+    magic, version, bits, hashes, count, length = struct.unpack(headerFormat, data[:size])
+    if magic != filterMagic:
+        raise ValueError("{} is not a policy filter".format(filename))
+    if version != filterVersion:
+        raise ValueError("{} has filter version {} instead of {}".format(filename, version, filterVersion))
+    header = json.loads(data[size:size + length].decode("utf-8"))
+    return BloomFilter(bits, hashes, count, bytearray(data[size + length:])), header["checksums"]
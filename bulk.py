@@ -0,0 +1,141 @@
+""" Description: This file bulk loads the eight TPC-H tables of a business database. The tables are created
+    without their primary keys (except on SQLite, which cannot add a primary key to an existing table) and
+    without the secondary indexes, and every table is loaded over its own connection at the same time, with
+    MySQL's unique and foreign key checks turned off for the connection and the keys of the table disabled.
+    Once all the rows are in, the primary key and the secondary indexes of every table are built, again
+    with one connection per table, so each index is sorted once from the loaded rows instead of being
+    updated row by row during the load. Since the keys are only checked when they are built, the files must
+    not have duplicate keys, which is true of dbgen's files and of tpch.py's data. The rows, bytes, and time
+    of every table's load and index build are returned so that the throughput can be reported.
+"""
+
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy import text
+from schema import businessTableDict, businessIndexes, recreateStatements
+from backend import backendName, isEmbedded, getEngine, getServerEngine, allowLocalFiles, loadFile, qualify
+
+#the primary key of a table definition
+primaryKeyPattern = re.compile(r", PRIMARY KEY \(([^)]*)\)")
+
+#returns True if the primary keys are built after the load; SQLite cannot add a primary key to a table
+def deferKeys():
+    return backendName != "sqlite"
+
+#returns the columns of the primary key of each business table
+def getPrimaryKeys():
+    keys = {}
+    for table in businessTableDict:
+        keys[table] = primaryKeyPattern.search(businessTableDict[table]).group(1)
+    return keys
+
+#returns the statements that drop and recreate the business tables of a database without the keys
+#and indexes that are built after the load
+def deferredStatements(database):
+    statements = []
+    for statement in recreateStatements("business", database):
+        if deferKeys():
+            statement = primaryKeyPattern.sub("", statement)
+        statements.append(statement)
+    return statements
+
+#returns the statements that build the primary key and secondary indexes of a business table;
+#MySQL builds them all in one ALTER TABLE so that the table is only rebuilt once
+def indexStatements(database, table):
+    name = qualify(database, table)
+    indexes = [entry for entry in businessIndexes if entry[0] == table]
+    if not isEmbedded():
+        clauses = ["ADD PRIMARY KEY ({})".format(getPrimaryKeys()[table])]
+        for entry in indexes:
+            clauses.append("ADD INDEX {} ({})".format(entry[1], entry[2]))
+        return ["ALTER TABLE {} {};".format(name, ", ".join(clauses))]
+    statements = []
+    if deferKeys():
+        statements.append("ALTER TABLE {} ADD PRIMARY KEY ({});".format(name, getPrimaryKeys()[table]))
+    for entry in indexes:
+        statements.append("CREATE INDEX {} ON {} ({});".format(entry[1], name, entry[2]))
+    return statements
+
+#turns off the checks that MySQL makes for every row during a load on this connection
+def beginLoad(conn, table=None):
+    if not isEmbedded():
+        conn.execute(text("SET unique_checks=0;"))
+        conn.execute(text("SET foreign_key_checks=0;"))
+        if table != None:
+            conn.execute(text("ALTER TABLE {} DISABLE KEYS;".format(table)))
+
+#turns the checks of beginLoad back on
+def endLoad(conn, table=None):
+    if not isEmbedded():
+        if table != None:
+            conn.execute(text("ALTER TABLE {} ENABLE KEYS;".format(table)))
+        conn.execute(text("SET unique_checks=1;"))
+        conn.execute(text("SET foreign_key_checks=1;"))
+
+#returns the number of lines of a file, reading it in blocks
+def countLines(filename):
+    count = 0
+    f = open(filename, "rb")
+    block = f.read(1 << 20)
+    while block:
+        count += block.count(b"\n")
+        block = f.read(1 << 20)
+    f.close()
+    return count
+
+#loads a .tbl file into a table over its own connection; returns the table, rows, bytes, and seconds
+def loadTable(database, table, filename):
+    began = time.time()
+    engine = getEngine(database)
+    with engine.connect() as conn:
+        beginLoad(conn, table)
+        loadFile(conn, filename, table, "|")
+        endLoad(conn, table)
+        conn.commit()
+    return table, countLines(filename), os.path.getsize(filename), time.time() - began
+
+#builds the primary key and secondary indexes of a table over its own connection; returns the table and seconds
+def indexTable(database, table):
+    began = time.time()
+    engine = getEngine(database)
+    with engine.connect() as conn:
+        for statement in indexStatements(database, table):
+            conn.execute(text(statement))
+        conn.commit()
+    return table, time.time() - began
+
+#runs a function for every table, on a thread per table; SQLite allows one writer, so its tables
+#are done one after another
+def runTables(function, arguments, workers):
+    if workers <= 1 or backendName == "sqlite":
+        return [function(*argument) for argument in arguments]
+    pool = ThreadPoolExecutor(max_workers=workers)
+    futures = [pool.submit(function, *argument) for argument in arguments]
+    results = [future.result() for future in futures]
+    pool.shutdown()
+    return results
+
+#drops and recreates the business tables of a database without the deferred keys and indexes
+def createTables(database):
+    engine = getServerEngine(database)
+    with engine.connect() as conn:
+        for statement in deferredStatements(database):
+            conn.execute(text(statement))
+        allowLocalFiles(conn)
+        conn.commit()
+
+#builds the keys and indexes of every business table of a database; returns the (table, seconds) of each
+def buildIndexes(database, workers=len(businessTableDict)):
+    return runTables(indexTable, [(database, table) for table in businessTableDict], workers)
+
+""" recreates the business tables of a database and loads the .tbl file of every table from
+    a directory, all of them at the same time, and then builds the keys and indexes. Returns
+    the (table, rows, bytes, seconds) of every load and the (table, seconds) of every index build.
+"""
+def loadTables(database, directory=".", workers=len(businessTableDict)):
+    createTables(database)
+    arguments = [(database, table, os.path.join(directory, table + ".tbl")) for table in businessTableDict]
+    loads = runTables(loadTable, arguments, workers)
+    return loads, buildIndexes(database, workers)
@@ -0,0 +1,56 @@
+""" Description: This file groups the principals of a multi-user workload into equivalence classes of their
+    effective policies, so that the driver can decide and rewrite each query once per class instead of once
+    per principal. The effective policies of an rbac user are the (permission, condition) pairs of the
+    policies of every role that the user has directly or through the role hierarchy, those of a pbac purpose
+    are the pairs of the policies of the purpose and the purposes above it, and those of an abac subject are
+    its subject attributes, which are all that the subject adds to an abac decision. The fingerprint of a
+    principal is a hash of its sorted effective policies, so two principals with the same fingerprint get
+    the same decisions and the same rewritten queries for every query, even if they have different roles.
+"""
+
+import hashlib
+import json
+from sqlalchemy import bindparam, text
+
+#the query that returns the effective policies of the given principals of each database; every row
+#is the principal's name followed by one item of its effective policies
+effectiveQueries = {"rbac": "SELECT DISTINCT a.u_name AS name, p.id, p.permission, p.con FROM assignment a JOIN role_closure c ON c.senior = a.r_name JOIN policy p ON p.r_name = c.junior WHERE a.u_name IN :names;",
+                    "pbac": "SELECT u.p_name AS name, p.id, p.permission, p.con FROM purpose u JOIN purpose q ON q.lft <= u.lft AND u.rgt <= q.rgt JOIN policy p ON p.purpose = q.p_name WHERE u.p_name IN :names;",
+                    "abac": "SELECT DISTINCT s_name AS name, s_attribute FROM s_assignment WHERE s_name IN :names;"}
+
+#returns the fingerprint of a list of effective policies, which does not depend on their order
+def fingerprint(items):
+    return hashlib.sha1(json.dumps(sorted(items)).encode()).hexdigest()[:12]
+
+#returns the item of a row of the effective policies query; the policy id is left out so that
+#policies with the same permission and condition count the same, but each policy is kept once
+#since the check functions join the conditions of every policy
+def effectiveItem(database, row):
+    if database == "abac":
+        return [row.s_attribute]
+    return [row.permission, row.con if row.con else ""]
+
+#returns the fingerprint of each of the given principals (users, subjects, or purposes) of the
+#database that the connection uses; principals without policies all have the same fingerprint
+def getFingerprints(conn, database, names):
+    items = {}
+    for name in names:
+        items[name] = []
+    if names:
+        result = conn.execute(text(effectiveQueries[database]).bindparams(bindparam("names", expanding=True)), {"names": list(items)})
+        for row in result:
+            if row.name in items:
+                items[row.name].append(effectiveItem(database, row))
+    fingerprints = {}
+    for name in items:
+        fingerprints[name] = fingerprint(items[name])
+    return fingerprints
+
+#returns the principals of each fingerprint, in the order that they were given
+def groupClasses(fingerprints):
+    classes = {}
+    for name in fingerprints:
+        if fingerprints[name] not in classes:
+            classes[fingerprints[name]] = []
+        classes[fingerprints[name]].append(name)
+    return classes
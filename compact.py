@@ -0,0 +1,172 @@
+""" Description: This file compacts the policy tables of the abac, rbac, and pbac permission databases by
+    removing policies that cannot change an access decision. For rbac and pbac, the conditions of all the
+    policies that give a role or purpose the same permission are joined with "and", so exact duplicates,
+    policies without a condition next to ones with a condition, and conditions that are implied by a
+    stricter condition on the same column (for example "s_suppkey > 100" makes "s_suppkey > 5" redundant)
+    are removed. For abac, the driver compares the sets of subject, object, and environment attributes of
+    all the policies of a permission, so each permission is rewritten into as few rows as hold every
+    distinct attribute. The compacted table replaces the policy table in one RENAME TABLE statement and
+    the policy_provenance table maps every original policy id to the compacted policy that replaced it.
+"""
+
+import re
+from sqlalchemy import text
+from schema import tableDict
+
+#the column that each policy is granted to, other than the permission
+principalColumn = {"rbac": "r_name", "pbac": "purpose"}
+
+#matches a comparison of a column to a number, such as "p_size > 10"
+boundPattern = re.compile(r"^(\w+)\s*(>=|<=|>|<)\s*(-?\d+(?:\.\d+)?)$")
+
+#returns the column, direction ("lower" or "upper"), value, and whether the bound is strict
+#for a comparison of a column to a number, or None for any other condition
+def parseBound(condition):
+    match = boundPattern.match(condition)
+    if not match:
+        return None
+    column, op, value = match.groups()
+    direction = "lower" if op[0] == ">" else "upper"
+    return column, direction, float(value), len(op) == 1
+
+#returns True if bound a implies bound b, which means that b can be removed
+def implies(a, b):
+    if a[0] != b[0] or a[1] != b[1]:
+        return False
+    if a[2] == b[2]:
+        return a[3] or not b[3]
+    if a[1] == "lower":
+        return a[2] > b[2]
+    return a[2] < b[2]
+
+""" folds a list of (id, condition) pairs that are joined with "and" into the smallest
+    list of conditions that means the same thing; returns the kept conditions as a list
+    of (id, condition) pairs and a dictionary of each original id to the id of the kept
+    condition that it was folded into
+"""
+def foldConditions(conditions):
+    kept = []
+    folded = {}
+    for id, condition in conditions:
+        condition = " ".join((condition or "").split())
+
+        #conditions without text do not change the result if there are other conditions
+        if not condition:
+            folded[id] = None
+            continue
+
+        bound = parseBound(condition)
+        replaced = False
+        for k in range(len(kept)):
+            other = kept[k][1]
+            if other == condition:
+                folded[id] = kept[k][0]
+                replaced = True
+                break
+            otherBound = parseBound(other)
+            if bound and otherBound and implies(otherBound, bound):
+                folded[id] = kept[k][0]
+                replaced = True
+                break
+            if bound and otherBound and implies(bound, otherBound):
+                #the new condition is stricter, so it takes the place of the kept one
+                kept[k] = (kept[k][0], condition)
+                folded[id] = kept[k][0]
+                replaced = True
+                break
+        if not replaced:
+            kept.append((id, condition))
+            folded[id] = id
+
+    #policies without a condition are kept as one policy if nothing else is
+    if not kept:
+        first = conditions[0][0]
+        kept.append((first, ""))
+    for id in folded:
+        if folded[id] == None:
+            folded[id] = kept[0][0]
+    return kept, folded
+
+#compacts the rows (id, principal, permission, con) of an rbac or pbac policy table;
+#returns the compacted rows and the (id, source id) provenance pairs
+def compactConditionRows(rows):
+    groups = {}
+    for row in rows:
+        key = (row[1], row[2])
+        if key not in groups:
+            groups[key] = []
+        groups[key].append((row[0], row[3]))
+    compacted = []
+    provenance = []
+    for key in groups:
+        kept, folded = foldConditions(groups[key])
+        for id, condition in kept:
+            compacted.append((id, key[0], key[1], condition))
+        for source in folded:
+            provenance.append((folded[source], source))
+    return compacted, provenance
+
+#compacts the rows (id, permission, s_attribute, o_attribute, e_attribute) of an abac
+#policy table; returns the compacted rows and the (id, source id) provenance pairs
+def compactAttributeRows(rows):
+    groups = {}
+    for row in rows:
+        if row[1] not in groups:
+            groups[row[1]] = {"ids": [], "s": [], "o": [], "e": []}
+        group = groups[row[1]]
+        group["ids"].append(row[0])
+        for key, value in (("s", row[2]), ("o", row[3]), ("e", row[4])):
+            value = value or ""
+            if value not in group[key]:
+                group[key].append(value)
+    compacted = []
+    provenance = []
+    for permission in groups:
+        group = groups[permission]
+        count = max(len(group["s"]), len(group["o"]), len(group["e"]))
+        for k in range(count):
+            s = group["s"][min(k, len(group["s"]) - 1)]
+            o = group["o"][min(k, len(group["o"]) - 1)]
+            e = group["e"][min(k, len(group["e"]) - 1)]
+            compacted.append((group["ids"][k], permission, s, o, e))
+        for k in range(len(group["ids"])):
+            provenance.append((group["ids"][min(k, count - 1)], group["ids"][k]))
+    return compacted, provenance
+
+""" compacts the policy table of the database that the connection uses and replaces it
+    and its provenance table; returns the number of policies before and after. The
+    compacted policies are written to policy_compact, which is swapped with the policy
+    table in one statement so that queries never see a partly written table.
+"""
+def compactPolicies(conn, database):
+    if database == "abac":
+        result = conn.execute(text("SELECT id, permission, s_attribute, o_attribute, e_attribute FROM policy ORDER BY id;"))
+        rows = [tuple(row) for row in result]
+        compacted, provenance = compactAttributeRows(rows)
+        insert = "INSERT INTO policy_compact (id, permission, s_attribute, o_attribute, e_attribute) VALUES (:id, :permission, :s, :o, :e);"
+        params = [{"id": r[0], "permission": r[1], "s": r[2], "o": r[3], "e": r[4]} for r in compacted]
+    else:
+        column = principalColumn[database]
+        result = conn.execute(text("SELECT id, {}, permission, con FROM policy ORDER BY id;".format(column)))
+        rows = [tuple(row) for row in result]
+        compacted, provenance = compactConditionRows(rows)
+        insert = "INSERT INTO policy_compact (id, {}, permission, con) VALUES (:id, :principal, :permission, :con);".format(column)
+        params = [{"id": r[0], "principal": r[1], "permission": r[2], "con": r[3]} for r in compacted]
+
+    conn.execute(text("DROP TABLE IF EXISTS policy_compact;"))
+    conn.execute(text("DROP TABLE IF EXISTS policy_old;"))
+    conn.execute(text("CREATE TABLE policy_compact LIKE policy;"))
+    conn.execute(text(tableDict[database]["policy_provenance"].format(database).replace("CREATE TABLE", "CREATE TABLE IF NOT EXISTS", 1)))
+    if params:
+        conn.execute(text(insert), params)
+    conn.execute(text("DELETE FROM policy_provenance;"))
+    if provenance:
+        conn.execute(text("INSERT INTO policy_provenance (id, source_id) VALUES (:id, :source);"), [{"id": p[0], "source": p[1]} for p in provenance])
+    conn.commit()
+    conn.execute(text("RENAME TABLE policy TO policy_old, policy_compact TO policy;"))
+    conn.execute(text("DROP TABLE policy_old;"))
+
+    #updates the table sizes in information_schema so that the memory can be compared
+    conn.execute(text("ANALYZE TABLE policy, policy_provenance;"))
+    conn.commit()
+    return len(rows), len(compacted)
@@ -0,0 +1,133 @@
+""" Description: This file computes the environment attributes of each access request instead of using the
+    fixed attributes "5/20/2020, security 1, morning, hp laptop". A RequestContext asks a clock for the
+    time of the request and a device source for the device and clearance session that the request comes
+    from, and turns them into the same kind of attributes that the policy generator writes: the date, the
+    clearance, the period of the day, and the device. The default context uses a fixed clock at 9am on
+    5/20/2020 and the hp laptop with security 1, so it gives the attributes that the driver always used.
+    Since the attributes change from request to request, this file also has the cache of partial abac
+    decisions, which is keyed by the time bucket of the request and the subject and environment
+    attributes that the decision depends on. All entries are dropped when a request falls into a newer
+    time bucket, so a cached decision is never older than the bucket, even if the policies change.
+"""
+
+import datetime
+import random
+import time
+from workload import baseEnvironment
+
+#the hour that each period of the day starts at
+periods = [(0, "night"), (6, "morning"), (12, "afternoon"), (18, "evening"), (22, "night")]
+
+#the devices and clearances that requests can come from, starting with the ones of the policy generator
+deviceList = [baseEnvironment[3], "dell desktop", "iphone", "android phone", "ipad", "chromebook"]
+clearanceList = [baseEnvironment[1], "security 2", "security 3", "security 4"]
+
+#the time of the fixed environment of the policy generator, 9am on 5/20/2020
+defaultTime = datetime.datetime(2020, 5, 20, 9).timestamp()
+
+#the time of each request is the current time
+class SystemClock:
+    def now(self):
+        return time.time()
+
+#the time of every request is the same
+class FixedClock:
+    def __init__(self, timestamp=defaultTime):
+        self.timestamp = timestamp
+
+    def now(self):
+        return self.timestamp
+
+#simulated time that moves forward by step seconds with every request, so that the time
+#buckets change as they would at a rate of 1 / step requests per second
+class SteppedClock:
+    def __init__(self, start=defaultTime, step=1.0):
+        self.timestamp = start
+        self.step = step
+
+    def now(self):
+        timestamp = self.timestamp
+        self.timestamp += self.step
+        return timestamp
+
+#every request comes from the same device and clearance session
+class FixedDevice:
+    def __init__(self, device=deviceList[0], clearance=clearanceList[0]):
+        self.device = device
+        self.clearance = clearance
+
+    def current(self):
+        return self.device, self.clearance
+
+#every request comes from one of the given devices and clearances, picked at random with a seed
+class RotatingDevice:
+    def __init__(self, devices, clearances, seed=0):
+        self.devices = devices
+        self.clearances = clearances
+        self.rng = random.Random(seed)
+
+    def current(self):
+        return self.rng.choice(self.devices), self.rng.choice(self.clearances)
+
+#returns the period of the day of an hour
+def periodOf(hour):
+    name = periods[0][1]
+    for start, period in periods:
+        if hour >= start:
+            name = period
+    return name
+
+#returns the environment attributes (date, clearance, period of the day, device) of a request
+#made at the given time from the given device and clearance session
+def environmentAt(timestamp, device, clearance):
+    moment = datetime.datetime.fromtimestamp(timestamp)
+    date = "{}/{}/{}".format(moment.month, moment.day, moment.year)
+    return [date, clearance, periodOf(moment.hour), device]
+
+#the clock and device source of the requests; the default gives the fixed environment of the policy generator
+class RequestContext:
+    def __init__(self, clock=None, devices=None, bucketSeconds=3600):
+        self.clock = clock if clock != None else FixedClock()
+        self.devices = devices if devices != None else FixedDevice()
+        self.bucketSeconds = bucketSeconds
+
+    #returns the time bucket and the environment attributes of the next request
+    def next(self):
+        timestamp = self.clock.now()
+        device, clearance = self.devices.current()
+        return int(timestamp // self.bucketSeconds), environmentAt(timestamp, device, clearance)
+
+""" partial abac decisions of one time bucket. A key is made by the caller from the
+    permission and the attribute sets that the decision depends on, and the value is
+    whatever the caller stores for it (it can be None). The entries are dropped when a
+    lookup is made for another bucket, and the hits and misses are counted for the
+    hit ratio.
+"""
+class DecisionCache:
+    def __init__(self):
+        self.bucket = None
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+
+    #returns (True, value) if the key is cached in the bucket, and (False, None) otherwise
+    def lookup(self, bucket, key):
+        if bucket != self.bucket:
+            if self.bucket != None:
+                self.expired += len(self.entries)
+            self.entries = {}
+            self.bucket = bucket
+        if key in self.entries:
+            self.hits += 1
+            return True, self.entries[key]
+        self.misses += 1
+        return False, None
+
+    def store(self, key, value):
+        self.entries[key] = value
+
+    #returns the fraction of lookups that were hits
+    def hitRatio(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
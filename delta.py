@@ -0,0 +1,154 @@
+""" Description: This file applies policy changes (deltas) to the abac, rbac, and pbac permission databases
+    without regenerating them, and contains the background writer that the driver uses to change policies
+    while queries are being executed. A delta is a dictionary with an "op" of "add", "revoke", or "modify",
+    the "id" of the policy, and for "add" and "modify" the policy's columns, for example
+    {"op": "add", "id": 5000, "r_name": "CEO", "permission": "s_name", "con": "s_acctbal > 10"}.
+    For rbac, the role hierarchy is changed with {"op": "inherit", "senior": "CEO", "junior": "manager"}
+    and {"op": "disinherit", ...}, which also update the role closure (see hierarchy.py). A pbac delta that
+    gives a policy to a purpose that is not in a purpose tree adds the purpose as its own tree (see purpose.py).
+    All the deltas given to applyDeltas are applied in one transaction, so the queries either see all of
+    them or none of them.
+"""
+
+import bisect
+import json
+import random
+import threading
+import time
+from sqlalchemy import text
+from hierarchy import addEdge, removeEdge
+from purpose import addPurpose
+
+#the columns of the policy table of each access control database, other than the id
+policyColumns = {"rbac": ["r_name", "permission", "con"],
+                 "abac": ["permission", "s_attribute", "o_attribute", "e_attribute"],
+                 "pbac": ["purpose", "permission", "con"]}
+
+#returns the statement and its parameters for one delta
+def deltaStatement(database, delta):
+    columns = policyColumns[database]
+    params = {"id": delta["id"]}
+    if delta["op"] == "add":
+        for column in columns:
+            params[column] = delta.get(column)
+        statement = "INSERT INTO policy (id, {}) VALUES (:id, {});".format(", ".join(columns), ", ".join([":" + column for column in columns]))
+    elif delta["op"] == "revoke":
+        statement = "DELETE FROM policy WHERE id = :id;"
+    elif delta["op"] == "modify":
+        sets = []
+        for column in columns:
+            if column in delta:
+                params[column] = delta[column]
+                sets.append("{0} = :{0}".format(column))
+        if not sets:
+            raise ValueError("modify delta for policy {} does not change any column".format(delta["id"]))
+        statement = "UPDATE policy SET {} WHERE id = :id;".format(", ".join(sets))
+    else:
+        raise ValueError("unknown delta operation: {}".format(delta["op"]))
+    return statement, params
+
+#applies a list of deltas to the policy table (or the rbac role hierarchy) of the database
+#that the connection uses in one transaction; nothing is applied if any of the deltas fails
+def applyDeltas(conn, database, deltas):
+    try:
+        for delta in deltas:
+            if delta["op"] in ("inherit", "disinherit"):
+                if database != "rbac":
+                    raise ValueError("only rbac has a role hierarchy")
+                if delta["op"] == "inherit":
+                    addEdge(conn, delta["senior"], delta["junior"])
+                else:
+                    removeEdge(conn, delta["senior"], delta["junior"])
+                continue
+            statement, params = deltaStatement(database, delta)
+            conn.execute(text(statement), params)
+            if database == "pbac" and delta.get("purpose") != None:
+                addPurpose(conn, delta["purpose"])
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+#reads a json file with a dictionary of database name to a list of deltas
+def loadDeltas(filename):
+    f = open(filename, "r")
+    deltas = json.load(f)
+    f.close()
+    for database in deltas:
+        if database not in policyColumns:
+            raise ValueError("unknown access control database: {}".format(database))
+    return deltas
+
+#returns the row lock waits and total row lock wait time in ms of the MySQL server
+def getLockWaits(conn):
+    waits = 0
+    waitTime = 0
+    result = conn.execute(text("SHOW GLOBAL STATUS LIKE 'Innodb_row_lock%';"))
+    for row in result:
+        if row[0] == "Innodb_row_lock_waits":
+            waits = int(row[1])
+        elif row[0] == "Innodb_row_lock_time":
+            waitTime = int(row[1])
+    return waits, waitTime
+
+""" changes policies of the given database at the given rate (deltas per second) until
+    the stop event is set. New policies grant random permissions from the permission
+    list using the principals and conditions already in the policy table, and only the
+    policies that were added by the writer are revoked or modified, so the original
+    dataset is restored when the writer removes what is left of them at the end.
+    The commit time of every delta is appended to stats["commits"].
+"""
+def churn(engine, database, permissions, rate, stop, stats, seed=0):
+    rng = random.Random(seed)
+    columns = policyColumns[database]
+    added = []
+    with engine.connect() as conn:
+
+        #values of each column that the new policies are made from
+        values = {}
+        for column in columns:
+            result = conn.execute(text("SELECT DISTINCT {} FROM policy LIMIT 1000;".format(column)))
+            values[column] = [row[0] for row in result]
+            if not values[column]:
+                values[column] = [""]
+        values["permission"] = permissions
+        result = conn.execute(text("SELECT MAX(id) FROM policy;"))
+        nextID = (result.scalar() or 0) + 1
+        conn.commit()
+
+        while not stop.is_set():
+            choice = rng.random()
+            if not added or choice < 0.5:
+                delta = {"op": "add", "id": nextID}
+                for column in columns:
+                    delta[column] = rng.choice(values[column])
+                added.append(nextID)
+                nextID += 1
+            elif choice < 0.75:
+                delta = {"op": "revoke", "id": added.pop(rng.randrange(len(added)))}
+            else:
+                column = rng.choice([column for column in columns if column != "permission"])
+                delta = {"op": "modify", "id": rng.choice(added), column: rng.choice(values[column])}
+            applyDeltas(conn, database, [delta])
+            stats["commits"].append(time.time())
+            stats["deltas"] += 1
+            stop.wait(1.0 / rate)
+
+        #revokes the policies that are left from the writer
+        applyDeltas(conn, database, [{"op": "revoke", "id": id} for id in added])
+
+#starts the background writer; returns the thread, its stop event, and its stats
+def startChurn(engine, database, permissions, rate, seed=0):
+    stop = threading.Event()
+    stats = {"commits": [], "deltas": 0}
+    thread = threading.Thread(target=churn, args=(engine, database, permissions, rate, stop, stats, seed), daemon=True)
+    thread.start()
+    return thread, stop, stats
+
+#returns how long a decision that ran from start to end may have used outdated policies:
+#the time from the first delta committed during the decision to the end of the decision
+def getStaleness(commits, start, end):
+    i = bisect.bisect_left(commits, start)
+    if i < len(commits) and commits[i] <= end:
+        return end - commits[i]
+    return 0.0
@@ -0,0 +1,131 @@
+""" Description: This file builds a dictionary-encoded copy of the policies of the abac, rbac, and pbac
+    permission databases. The policy and assignment tables store the same permissions, conditions, and
+    attributes (such as "sum(l_extendedprice)" or "l_shipdate between '1993-01-01' and '1996-01-01'") as
+    text in every row, so every lookup compares strings. The encoded copy stores each distinct value once
+    in a lookup table (permission_dict, condition_dict, attribute_dict, role_dict, purpose_dict) and the
+    policy, assignment, role closure, and purpose interval rows (policy_enc, assignment_enc,
+    role_closure_enc, s_assignment_enc, o_assignment_enc, purpose_enc) only hold the integer ids of the
+    values. The text tables are left as they are, since the policy generator,
+    the policy changes, and compaction work on them, so the encoded copy is rebuilt from them with
+    encodePolicies before it is used. IdCache reads the lookup tables once so that the driver can turn
+    the query's permissions into ids and the ids in the results back into conditions without asking the
+    database again.
+"""
+
+from sqlalchemy import text
+from schema import tableDict
+from backend import isEmbedded, localStatements, tableSizes
+
+#table definitions of the encoded copy of each access control database, in the order that they are filled
+encodedTableDict = {"rbac": {"permission_dict": "CREATE TABLE {}.permission_dict (id INT NOT NULL, value VARCHAR(191) NOT NULL, PRIMARY KEY (id));",
+                             "condition_dict": "CREATE TABLE {}.condition_dict (id INT NOT NULL, value VARCHAR(191) NOT NULL, PRIMARY KEY (id));",
+                             "role_dict": "CREATE TABLE {}.role_dict (id INT NOT NULL, value VARCHAR(191) NOT NULL, PRIMARY KEY (id));",
+                             "assignment_enc": "CREATE TABLE {}.assignment_enc (u_name VARCHAR(191) NOT NULL, r_id INT NOT NULL);",
+                             "role_closure_enc": "CREATE TABLE {}.role_closure_enc (senior_id INT NOT NULL, junior_id INT NOT NULL, PRIMARY KEY (senior_id, junior_id));",
+                             "policy_enc": "CREATE TABLE {}.policy_enc (id INT NOT NULL, r_id INT, permission_id INT, con_id INT, PRIMARY KEY (id));"},
+                    "abac": {"permission_dict": "CREATE TABLE {}.permission_dict (id INT NOT NULL, value VARCHAR(191) NOT NULL, PRIMARY KEY (id));",
+                             "attribute_dict": "CREATE TABLE {}.attribute_dict (id INT NOT NULL, value VARCHAR(191) NOT NULL, PRIMARY KEY (id));",
+                             "s_assignment_enc": "CREATE TABLE {}.s_assignment_enc (s_name VARCHAR(191) NOT NULL, s_attribute_id INT NOT NULL);",
+                             "o_assignment_enc": "CREATE TABLE {}.o_assignment_enc (o_id INT NOT NULL, o_attribute_id INT NOT NULL);",
+                             "policy_enc": "CREATE TABLE {}.policy_enc (id INT NOT NULL, permission_id INT, s_attribute_id INT, o_attribute_id INT, e_attribute_id INT, PRIMARY KEY (id));"},
+                    "pbac": {"permission_dict": "CREATE TABLE {}.permission_dict (id INT NOT NULL, value VARCHAR(191) NOT NULL, PRIMARY KEY (id));",
+                             "condition_dict": "CREATE TABLE {}.condition_dict (id INT NOT NULL, value VARCHAR(191) NOT NULL, PRIMARY KEY (id));",
+                             "purpose_dict": "CREATE TABLE {}.purpose_dict (id INT NOT NULL, value VARCHAR(191) NOT NULL, PRIMARY KEY (id));",
+                             "purpose_enc": "CREATE TABLE {}.purpose_enc (purpose_id INT NOT NULL, lft INT NOT NULL, rgt INT NOT NULL, PRIMARY KEY (purpose_id));",
+                             "policy_enc": "CREATE TABLE {}.policy_enc (id INT NOT NULL, purpose_id INT, permission_id INT, con_id INT, PRIMARY KEY (id));"}}
+
+#secondary indexes of the encoded tables in each index profile (see indexProfiles in schema.py) as
+#(database, table, index name, columns), on the id columns that the encoded lookups filter and join on,
+#so that the encoded tables are measured with the same indexing as the text tables
+encodedIndexProfiles = {"none": [],
+                        "single": [("rbac", "assignment_enc", "idx_enc_u_name", "u_name"), ("rbac", "policy_enc", "idx_enc_r_id", "r_id"), ("rbac", "policy_enc", "idx_enc_permission_id", "permission_id"),
+                                   ("abac", "s_assignment_enc", "idx_enc_s_name", "s_name"), ("abac", "o_assignment_enc", "idx_enc_o_id", "o_id"), ("abac", "policy_enc", "idx_enc_permission_id", "permission_id"),
+                                   ("pbac", "policy_enc", "idx_enc_purpose_id", "purpose_id"), ("pbac", "policy_enc", "idx_enc_permission_id", "permission_id"), ("pbac", "purpose_enc", "idx_enc_lft_rgt", "lft, rgt")],
+                        "covering": [("rbac", "assignment_enc", "idx_enc_u_name_r_id", "u_name, r_id"), ("rbac", "policy_enc", "idx_enc_r_id_permission_id_con_id", "r_id, permission_id, con_id"),
+                                     ("abac", "s_assignment_enc", "idx_enc_s_name_s_attribute_id", "s_name, s_attribute_id"), ("abac", "o_assignment_enc", "idx_enc_o_id_o_attribute_id", "o_id, o_attribute_id"),
+                                     ("abac", "policy_enc", "idx_enc_permission_id_attributes", "permission_id, s_attribute_id, o_attribute_id, e_attribute_id"),
+                                     ("pbac", "policy_enc", "idx_enc_purpose_id_permission_id_con_id", "purpose_id, permission_id, con_id"), ("pbac", "purpose_enc", "idx_enc_lft_rgt_purpose_id", "lft, rgt, purpose_id")]}
+
+#the (table, column) pairs of the text tables whose values are stored in each lookup table
+dictionaryColumns = {"rbac": {"permission_dict": [("policy", "permission")],
+                              "condition_dict": [("policy", "con")],
+                              "role_dict": [("role", "r_name"), ("assignment", "r_name"), ("policy", "r_name"), ("role_closure", "senior"), ("role_closure", "junior")]},
+                     "abac": {"permission_dict": [("policy", "permission"), ("object", "o_name"), ("o_assignment", "o_name")],
+                              "attribute_dict": [("s_assignment", "s_attribute"), ("o_assignment", "o_attribute"), ("policy", "s_attribute"), ("policy", "o_attribute"), ("policy", "e_attribute")]},
+                     "pbac": {"permission_dict": [("policy", "permission")],
+                              "condition_dict": [("policy", "con")],
+                              "purpose_dict": [("policy", "purpose"), ("purpose", "p_name")]}}
+
+#statements that fill the encoded tables from the text tables and the lookup tables;
+#conditions without text are stored as NULL, which the driver treats the same as an empty condition
+encodeStatements = {"rbac": ["INSERT INTO assignment_enc (u_name, r_id) SELECT a.u_name, r.id FROM assignment a JOIN role_dict r ON r.value = a.r_name;",
+                             "INSERT INTO role_closure_enc (senior_id, junior_id) SELECT s.id, j.id FROM role_closure c JOIN role_dict s ON s.value = c.senior JOIN role_dict j ON j.value = c.junior;",
+                             "INSERT INTO policy_enc (id, r_id, permission_id, con_id) SELECT p.id, r.id, d.id, c.id FROM policy p LEFT JOIN role_dict r ON r.value = p.r_name LEFT JOIN permission_dict d ON d.value = p.permission LEFT JOIN condition_dict c ON c.value = p.con;"],
+                    "abac": ["INSERT INTO s_assignment_enc (s_name, s_attribute_id) SELECT s.s_name, a.id FROM s_assignment s JOIN attribute_dict a ON a.value = s.s_attribute;",
+                             "INSERT INTO o_assignment_enc (o_id, o_attribute_id) SELECT d.id, a.id FROM o_assignment o JOIN permission_dict d ON d.value = o.o_name JOIN attribute_dict a ON a.value = o.o_attribute;",
+                             "INSERT INTO policy_enc (id, permission_id, s_attribute_id, o_attribute_id, e_attribute_id) SELECT p.id, d.id, s.id, o.id, e.id FROM policy p LEFT JOIN permission_dict d ON d.value = p.permission LEFT JOIN attribute_dict s ON s.value = p.s_attribute LEFT JOIN attribute_dict o ON o.value = p.o_attribute LEFT JOIN attribute_dict e ON e.value = p.e_attribute;"],
+                    "pbac": ["INSERT INTO purpose_enc (purpose_id, lft, rgt) SELECT u.id, p.lft, p.rgt FROM purpose p JOIN purpose_dict u ON u.value = p.p_name;",
+                             "INSERT INTO policy_enc (id, purpose_id, permission_id, con_id) SELECT p.id, u.id, d.id, c.id FROM policy p LEFT JOIN purpose_dict u ON u.value = p.purpose LEFT JOIN permission_dict d ON d.value = p.permission LEFT JOIN condition_dict c ON c.value = p.con;"]}
+
+#returns the statement that fills a lookup table with the distinct values of its text columns,
+#numbered from 1 in sorted order
+def dictionaryStatement(database, table):
+    selects = []
+    for source, column in dictionaryColumns[database][table]:
+        selects.append("SELECT DISTINCT {1} AS value FROM {0} WHERE {1} IS NOT NULL AND {1} != ''".format(source, column))
+    return "INSERT INTO {0} (id, value) SELECT ROW_NUMBER() OVER (ORDER BY value), value FROM ({1}) AS v;".format(table, " UNION ".join(selects))
+
+""" drops and rebuilds the encoded copy of the database that the connection uses from its
+    text tables. The lookup tables are filled first, and then the policy and assignment
+    rows are written with the ids of their values, so the encoded copy holds the same
+    policies as the text tables at the time that it was built. The indexes of the index
+    profile are built once the rows are in.
+"""
+def encodePolicies(conn, database, profile="none"):
+    for table in reversed(list(encodedTableDict[database])):
+        conn.execute(text("DROP TABLE IF EXISTS {};".format(table)))
+    for statement in localStatements([encodedTableDict[database][table].format(database) for table in encodedTableDict[database]]):
+        conn.execute(text(statement))
+    for table in dictionaryColumns[database]:
+        conn.execute(text(dictionaryStatement(database, table)))
+    for statement in encodeStatements[database]:
+        conn.execute(text(statement))
+    for entry in encodedIndexProfiles[profile]:
+        if entry[0] == database:
+            conn.execute(text("CREATE INDEX {} ON {} ({});".format(entry[2], entry[1], entry[3])))
+    conn.commit()
+
+    #updates the table sizes in information_schema so that the memory can be compared;
+    #the embedded backends measure the tables' pages directly
+    if not isEmbedded():
+        conn.execute(text("ANALYZE TABLE {};".format(", ".join(list(tableDict[database]) + list(encodedTableDict[database])))))
+        conn.commit()
+
+#returns the memory in mb of the text tables and of the encoded tables of the given database
+def getFootprint(conn, database):
+    sizes = dict(tableSizes(conn, database))
+    textSize = sum([sizes.get(table, 0.0) for table in tableDict[database] if table != "policy_provenance"])
+    encodedSize = sum([sizes.get(table, 0.0) for table in encodedTableDict[database]])
+    return textSize, encodedSize
+
+#the values and ids of the lookup tables of one database, read once and then kept for the process
+class IdCache:
+    def __init__(self, conn, database):
+        self.ids = {}
+        self.values = {}
+        for table in encodedTableDict[database]:
+            if table.endswith("_dict"):
+                self.ids[table] = {}
+                self.values[table] = {}
+                result = conn.execute(text("SELECT id, value FROM {};".format(table)))
+                for row in result:
+                    self.ids[table][row.value] = row.id
+                    self.values[table][row.id] = row.value
+
+    #returns the id of a value in the lookup table, or None if the value is not stored
+    def getID(self, table, value):
+        return self.ids[table].get(value)
+
+    #returns the value of an id in the lookup table, or None for a NULL id
+    def getValue(self, table, id):
+        return self.values[table].get(id)
@@ -0,0 +1,76 @@
+""" Description: This file maintains the role hierarchy of the rbac permission database. A row (senior, junior)
+    of role_hierarchy means that the senior role has every permission of the junior role. The driver does
+    not walk the hierarchy when it checks a user's permissions; instead role_closure stores every pair of
+    roles (senior, junior) where the senior role reaches the junior role through the hierarchy, including
+    each role with itself at depth 0, so the permissions of all the roles that a user has directly or
+    through inheritance are found with one join no matter how deep the hierarchy is. The closure is
+    built once after the policies are loaded and then kept up to date when edges are added or removed,
+    without rebuilding it. None of the functions commit, so that they can be part of a larger transaction.
+"""
+
+from sqlalchemy import bindparam, text
+
+#returns the closure rows (senior, junior, depth) of the given roles and hierarchy edges,
+#where depth is the length of the shortest path from the senior role to the junior role
+def closureRows(roles, edges):
+    juniors = {}
+    for senior, junior in edges:
+        if senior not in juniors:
+            juniors[senior] = []
+        juniors[senior].append(junior)
+    rows = []
+    for role in roles:
+        depths = {role: 0}
+        level = [role]
+        while level:
+            next = []
+            for r in level:
+                for junior in juniors.get(r, []):
+                    if junior not in depths:
+                        depths[junior] = depths[r] + 1
+                        next.append(junior)
+            level = next
+        for junior in depths:
+            rows.append((role, junior, depths[junior]))
+    return rows
+
+#returns the edges of the role hierarchy
+def getEdges(conn):
+    result = conn.execute(text("SELECT senior, junior FROM role_hierarchy;"))
+    return [(row.senior, row.junior) for row in result]
+
+#inserts closure rows into role_closure
+def insertClosure(conn, rows):
+    if rows:
+        conn.execute(text("INSERT INTO role_closure (senior, junior, depth) VALUES (:senior, :junior, :depth);"), [{"senior": r[0], "junior": r[1], "depth": r[2]} for r in rows])
+
+#rebuilds role_closure from the roles, role assignments, and role hierarchy
+def buildClosure(conn):
+    result = conn.execute(text("SELECT r_name FROM role UNION SELECT r_name FROM assignment UNION SELECT senior FROM role_hierarchy UNION SELECT junior FROM role_hierarchy;"))
+    roles = [row[0] for row in result]
+    conn.execute(text("DELETE FROM role_closure;"))
+    insertClosure(conn, closureRows(roles, getEdges(conn)))
+
+""" adds the edge (senior, junior) to the role hierarchy and adds the pairs that it
+    connects to role_closure: every role that reaches the senior role now reaches every
+    role that the junior role reaches. Pairs that were already connected keep the
+    shorter depth.
+"""
+def addEdge(conn, senior, junior):
+    params = {"senior": senior, "junior": junior}
+    conn.execute(text("INSERT INTO role_hierarchy (senior, junior) VALUES (:senior, :junior);"), params)
+    conn.execute(text("INSERT IGNORE INTO role_closure (senior, junior, depth) VALUES (:senior, :senior, 0), (:junior, :junior, 0);"), params)
+    conn.execute(text("INSERT INTO role_closure (senior, junior, depth) SELECT a.senior, b.junior, a.depth + b.depth + 1 FROM role_closure a, role_closure b WHERE a.junior = :senior AND b.senior = :junior ON DUPLICATE KEY UPDATE depth = LEAST(role_closure.depth, VALUES(depth));"), params)
+
+""" removes the edge (senior, junior) from the role hierarchy. Only the roles that
+    reached the senior role could have reached other roles through the edge, so only
+    their rows of role_closure are recomputed from the remaining edges.
+"""
+def removeEdge(conn, senior, junior):
+    params = {"senior": senior, "junior": junior}
+    conn.execute(text("DELETE FROM role_hierarchy WHERE senior = :senior AND junior = :junior;"), params)
+    result = conn.execute(text("SELECT senior FROM role_closure WHERE junior = :senior;"), params)
+    roles = [row.senior for row in result]
+    if roles:
+        conn.execute(text("DELETE FROM role_closure WHERE senior IN :roles;").bindparams(bindparam("roles", expanding=True)), {"roles": roles})
+        insertClosure(conn, closureRows(roles, getEdges(conn)))
@@ -0,0 +1,331 @@
+""" Description: This program measures the functions that the driver runs for every query on their own, instead of
+    through a whole run of the 22 queries: the permission checks of the three models (checkABAC, checkRBAC, and
+    checkPBAC) and the query rewrites (createView, abacFix, and fixQuery21). For every size that is chosen, a
+    policy store of that many policies is generated with a fixed seed into each access control database of an
+    embedded backend (SQLite unless AC_BACKEND is duckdb, in the AC_DATA_DIR directory, "microbench" by default),
+    with the same policies for Alice, the CEO role and subject attribute, and the "organize data" purpose at every
+    size and the rest of the policies given to other principals, so only the size of the tables changes. Every
+    function is called with the selection items of the 22 queries, and the rewrites with the decisions of the
+    checks, for a number of rounds after one round that is not timed. The calls per second and the bytes that
+    are allocated per call (the peak of a separate round that is traced with tracemalloc) are printed and saved
+    to data.csv, and compared with the baseline in microbench.json, if there is one. The program exits with
+    status 1 if a function is slower or allocates more than the baseline by more than the threshold, so that
+    it can fail a CI job. The sizes, rounds, index profile, and threshold can be given on the command line
+    (for example "python microbench.py --sizes 2,3,4 --rounds 20 --profile covering --threshold 25
+    --save-baseline") so that a CI job does not have to answer the prompts; the ones that are not given are
+    asked for.
+"""
+
+import os
+import sys
+import argparse
+import json
+import random
+import time
+import tracemalloc
+
+#the policy stores are generated into their own embedded databases, so that they do not replace the
+#databases that the driver is run against; these are set before backend.py reads them
+os.environ.setdefault("AC_BACKEND", "sqlite")
+os.environ.setdefault("AC_DATA_DIR", "microbench")
+
+from sqlalchemy import text
+from schema import indexProfiles, recreateStatements, applyProfile
+from hierarchy import buildClosure
+from purpose import buildIntervals
+from policies import conditionDict, getTable
+from backend import isEmbedded, getEngine, loadLines, businessDatabase
+import driver
+
+#the seed of the policy stores, the file that the baseline is saved in, and how many lines are loaded at a time
+seed = 491
+baselineFile = "microbench.json"
+chunkSize = 100000
+
+#the queries whose conditions are placed in a nested query by createView, which always makes the view temp0
+nestedQueries = [6, 7, 8, 12, 21]
+
+#the functions that are measured, in the order that they are reported, and the model that each one uses
+functionList = [("checkABAC", '1'), ("checkRBAC", '2'), ("checkPBAC", '3'), ("createView", '2'), ("abacFix", '1'), ("fixQuery21", '2')]
+
+#keeps the counts of a permission check without printing them or writing them to data.csv,
+#so that the time of the report is not part of the time of the check
+def keepCounts(queryCount, appliedCount):
+    driver.lastCounts = (queryCount, appliedCount)
+
+#returns every permission that the queries select, once each, in the order of the queries
+def getPermissions():
+    permissions = []
+    for i in driver.permissionList:
+        for permission in i:
+            if permission not in permissions:
+                permissions.append(permission)
+    return permissions
+
+#returns a random condition of a permission's table, or "" for a policy without a condition
+def randomCondition(rng, permission):
+    if rng.random() < 0.5:
+        return ""
+    return rng.choice(conditionDict[getTable(permission)])
+
+""" returns the policies that are the same at every size, as (permission, condition) pairs.
+    Each permission is granted with a probability of 0.75, so that the rewrites have selection
+    items to remove, and about half of the policies have a condition.
+"""
+def basePolicies(rng):
+    policies = []
+    for permission in getPermissions():
+        if rng.random() < 0.75:
+            policies.append((permission, randomCondition(rng, permission)))
+    return policies
+
+#loads the lines that a generator makes into a table, a chunk at a time
+def loadChunks(conn, lines, table):
+    chunk = []
+    for line in lines:
+        chunk.append(line)
+        if len(chunk) == chunkSize:
+            loadLines(conn, chunk, table)
+            chunk = []
+    if chunk:
+        loadLines(conn, chunk, table)
+
+#returns the lines of the noise policies of a model; they are given to the numbered roles, subject
+#attributes, and purposes, and the abac ones to numbered permissions that the queries do not select
+def noiseLines(rng, model, start, size, principals):
+    permissions = getPermissions()
+    for id in range(start, size):
+        principal = "noise " + str(rng.randrange(principals))
+        if model == "abac":
+            yield "{},permission {},{},{},{},\n".format(id, rng.randrange(size), principal, principal, principal)
+            continue
+        permission = rng.choice(permissions)
+        yield "{},{},{},{},\n".format(id, principal, permission, randomCondition(rng, permission))
+
+""" drops and recreates the rbac, abac, and pbac databases with the given number of policies
+    and the business tables without any rows, which createView makes its views on, and
+    creates the index profile on the access control databases.
+"""
+def buildStores(size, profile):
+    rng = random.Random(seed)
+    base = basePolicies(rng)
+    environment = driver.nextRequest()[1]
+    principals = max(1, size // 10)
+    engine = getEngine(businessDatabase)
+    with engine.connect() as conn:
+        for statement in recreateStatements("business", businessDatabase):
+            conn.execute(text(statement))
+        conn.commit()
+    for database in ["rbac", "abac", "pbac"]:
+        engine = getEngine(database)
+        with engine.connect() as conn:
+            for statement in recreateStatements(database):
+                conn.execute(text(statement))
+            if database == "rbac":
+                conn.execute(text("INSERT INTO assignment (u_name, r_name) VALUES ('Alice', 'CEO');"))
+                loadChunks(conn, ("noise {0},noise {0},\n".format(p) for p in range(principals)), "assignment")
+                loadChunks(conn, ("{},CEO,{},{},\n".format(id, base[id][0], base[id][1]) for id in range(len(base))), "policy")
+                loadChunks(conn, noiseLines(rng, database, len(base), size, principals), "policy")
+                buildClosure(conn)
+            elif database == "abac":
+                conn.execute(text("INSERT INTO s_assignment (s_name, s_attribute) VALUES ('Alice', 'CEO');"))
+                lines = []
+                assignments = []
+                for id in range(len(base)):
+                    permission, condition = base[id]
+                    if condition == "":
+                        condition = "admin owner"
+                    lines.append("{},{},CEO,{},{},\n".format(id, permission, condition, rng.choice(environment)))
+                    if (permission, condition) not in assignments:
+                        assignments.append((permission, condition))
+                loadChunks(conn, ("{},{},\n".format(permission, condition) for permission, condition in assignments), "o_assignment")
+                loadChunks(conn, lines, "policy")
+                loadChunks(conn, noiseLines(rng, database, len(base), size, principals), "policy")
+            else:
+                loadChunks(conn, ("{},organize data,{},{},\n".format(id, base[id][0], base[id][1]) for id in range(len(base))), "policy")
+                loadChunks(conn, noiseLines(rng, database, len(base), size, principals), "policy")
+
+                #the noise purposes are a tree where the parent of purpose k is purpose k // 10
+                buildIntervals(conn, [("noise " + str(p // 10), "noise " + str(p)) for p in range(1, principals)])
+            conn.commit()
+            applyProfile(conn, database, profile)
+
+#returns the decisions of every query for a model, with the functions that check them
+def getDecisions(model):
+    driver.setModel(model)
+    return [driver.getAllowed(model, driver.permissionList[i], driver.queryList[i]) for i in range(22)]
+
+#drops the views that createView made for query i, the same way as runAC
+def dropViews(conditions, i):
+    with driver.engine1.connect() as conn:
+        if i in nestedQueries:
+            conn.execute(text("drop view temp0;"))
+        else:
+            for c in range(len(driver.separateConditions(conditions))):
+                conn.execute(text("drop view temp{};".format(c)))
+        conn.commit()
+
+#returns the conditions of a decision that createView and abacFix are given by runAC
+def getConditions(allowed):
+    return [v for v in allowed.values() if v]
+
+""" returns the calls that measure a function as (arguments, cleanup) pairs, where the cleanup
+    is run after every call without being timed. The checks are called with the selection items
+    of every query and the rewrites with the decisions of the fixture's policies; query 15 is
+    left out of createView since runAC rewrites its statements separately.
+"""
+def getCalls(name, decisions):
+    calls = []
+    if name == "checkABAC":
+        for i in range(22):
+            calls.append(((driver.permissionList[i], driver.queryList[i], "Alice"), None))
+    elif name == "checkRBAC":
+        for i in range(22):
+            calls.append(((driver.permissionList[i], driver.queryList[i], "Alice"), None))
+    elif name == "checkPBAC":
+        for i in range(22):
+            calls.append(((driver.permissionList[i], driver.queryList[i], "organize data"), None))
+    elif name == "createView":
+        for i in range(22):
+            conditions = getConditions(decisions['2'][i])
+            if conditions and i != 14:
+                calls.append(((conditions, driver.queryList[i], 0, i), (dropViews, (conditions, i))))
+    elif name == "abacFix":
+        for i in range(22):
+            calls.append(((decisions['1'][i].values(), driver.queryList[i], i), None))
+    elif name == "fixQuery21":
+        for model in ['1', '2', '3']:
+            calls.append(((decisions[model][20], driver.queryList[20]), None))
+    return calls
+
+#makes every call once and runs its cleanup
+def callOnce(function, calls):
+    for arguments, cleanup in calls:
+        function(*arguments)
+        if cleanup != None:
+            cleanup[0](*cleanup[1])
+
+""" measures a function with its calls; returns the calls per second of the timed rounds and the
+    average peak of the bytes that were allocated during a call, from one more round that is
+    traced. The first round is not timed, so that every statement is compiled before it is.
+"""
+def measure(function, calls, rounds):
+    callOnce(function, calls)
+    total = 0
+    for r in range(rounds):
+        for arguments, cleanup in calls:
+            start = time.perf_counter()
+            function(*arguments)
+            end = time.perf_counter()
+            total += end - start
+            if cleanup != None:
+                cleanup[0](*cleanup[1])
+    allocated = 0
+    tracemalloc.start()
+    for arguments, cleanup in calls:
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        function(*arguments)
+        allocated += tracemalloc.get_traced_memory()[1] - before
+        if cleanup != None:
+            cleanup[0](*cleanup[1])
+    tracemalloc.stop()
+    return (rounds * len(calls)) / total, allocated / len(calls)
+
+#reads the baseline results, which are keyed by "function,size"
+def loadBaseline():
+    if not os.path.exists(baselineFile):
+        return {}
+    f = open(baselineFile, "r")
+    baseline = json.load(f)
+    f.close()
+    return baseline
+
+#saves the results as the baseline
+def saveBaseline(results):
+    f = open(baselineFile, "w")
+    json.dump(results, f, indent=4, sort_keys=True)
+    f.close()
+
+#returns the ways that a result is worse than its baseline by more than the threshold (a fraction)
+def compareResult(result, baseline, threshold):
+    problems = []
+    if result["ops"] < baseline["ops"] * (1 - threshold):
+        problems.append("{:.1f} calls per second instead of {:.1f}".format(result["ops"], baseline["ops"]))
+    if result["bytes"] > baseline["bytes"] * (1 + threshold):
+        problems.append("{:.0f} bytes allocated per call instead of {:.0f}".format(result["bytes"], baseline["bytes"]))
+    return problems
+
+#returns the settings that are given on the command line; the ones that are not given are None
+def parseArguments(arguments):
+    parser = argparse.ArgumentParser(description="Measures the permission checks and query rewrites of driver.py against policy stores of increasing size.")
+    parser.add_argument("--sizes", help="sizes of the policy stores as powers of ten from 2 to 7, separated with a comma")
+    parser.add_argument("--rounds", type=int, help="number of rounds for each function")
+    parser.add_argument("--profile", choices=list(indexProfiles), help="index profile of the access control databases")
+    parser.add_argument("--threshold", type=float, help="regression threshold in percent")
+    parser.add_argument("--save-baseline", action="store_true", help="save the results as the baseline in " + baselineFile)
+    return parser.parse_args(arguments)
+
+""" measures every function at every size and compares the results with the baseline. The
+    settings that are not given on the command line are asked for, and whether to save the
+    results as the baseline is only asked if no settings are given at all, so that a run
+    with settings never waits for input.
+"""
+def main(arguments=None):
+    if arguments == None:
+        arguments = sys.argv[1:]
+    options = parseArguments(arguments)
+    if not isEmbedded():
+        print("\nTHE MICROBENCHMARKS USE AN EMBEDDED BACKEND (AC_BACKEND=sqlite OR duckdb)\n")
+        return
+    sizes = options.sizes
+    if sizes == None:
+        sizes = input("Enter sizes of the policy stores as powers of ten from 2 to 7 (separate with a comma): \n")
+    sizes = [10 ** int(p) for p in sizes.split(",")]
+    rounds = options.rounds
+    if rounds == None:
+        rounds = int(input("Enter number of rounds for each function: \n"))
+    profile = options.profile
+    while profile not in indexProfiles:
+        profile = input("Pick index profile: none, single, covering\n")
+    threshold = options.threshold
+    if threshold == None:
+        threshold = float(input("Enter regression threshold in percent: \n"))
+    threshold = threshold / 100
+    save = options.save_baseline
+    if not save and not arguments:
+        save = input("Save the results as the baseline? (y/n) \n") == "y"
+    driver.writeCounts = keepCounts
+    baseline = loadBaseline()
+    results = {}
+    regressions = []
+    for size in sizes:
+        start = time.time()
+        buildStores(size, profile)
+        end = time.time()
+        print("\nTIME TO BUILD POLICY STORES OF " + str(size) + " POLICIES: " + str(end - start) + "\n")
+        decisions = {}
+        for model in ['1', '2', '3']:
+            decisions[model] = getDecisions(model)
+        for name, model in functionList:
+            driver.setModel(model)
+            ops, allocated = measure(getattr(driver, name), getCalls(name, decisions), rounds)
+            key = name + "," + str(size)
+            results[key] = {"ops": ops, "bytes": allocated}
+            print("\n" + name.upper() + " WITH " + str(size) + " POLICIES: " + str(ops) + " CALLS PER SECOND, " + str(allocated) + " BYTES ALLOCATED PER CALL\n")
+            f = open("data.csv", "a")
+            f.write("microbench," + key + "," + str(ops) + "," + str(allocated) + ",\n")
+            f.close()
+            if key in baseline:
+                for problem in compareResult(results[key], baseline[key], threshold):
+                    regressions.append(key + ": " + problem)
+    if save:
+        baseline.update(results)
+        saveBaseline(baseline)
+    for regression in regressions:
+        print("REGRESSION: " + regression)
+    if regressions:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
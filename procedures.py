@@ -0,0 +1,62 @@
+""" Description: This file installs a stored procedure named get_allowed in each access control database, so that
+    the driver can decide all the permissions of a query with one CALL instead of one or more queries per
+    selection item. The procedure takes the principal (the user for rbac, the purpose for pbac, and the
+    subject and the environment attributes for abac) and the query's permissions as a json array, and returns
+    one row for every permission that is allowed, with the conditions of its policies joined with " and " (or
+    NULL if it has none) and the number of policies that were applied. The decisions are the same as the check
+    functions of the driver, with none of the joined conditions cut short (see setLength): an rbac or pbac
+    permission is allowed if the user has a role, or the purpose is under a purpose, with a policy for it, and
+    an abac permission is allowed if every one of its policies has one of the subject's attributes, one of the
+    environment attributes, and one of the permission's object attributes (see evaluateABAC in driver.py). The permissions and attributes are compared with the json
+    arrays exactly, with JSON_CONTAINS, as the driver compares them. Only MySQL has stored procedures.
+"""
+
+import json
+from sqlalchemy import text
+
+#the policies of the permissions in the json array
+permissionFilter = "JSON_CONTAINS(permissions, JSON_QUOTE(p.permission))"
+
+#the policies whose object attribute is a condition (not "any" and with a comparison), the same test as evaluateABAC
+abacCondition = "(d.o_attribute IS NOT NULL AND d.o_attribute != 'any' AND (INSTR(d.o_attribute, '<') > 0 OR INSTR(d.o_attribute, '>') > 0 OR INSTR(d.o_attribute, '=') > 0 OR INSTR(d.o_attribute, 'between') > 0))"
+
+#GROUP_CONCAT cuts the joined conditions off at group_concat_max_len (1024 bytes by default) with only a
+#warning, and a permission can have many conditions, so each procedure raises it to the largest value
+#for its session before it joins them
+setLength = "BEGIN SET SESSION group_concat_max_len = 4294967295; "
+
+#the statements that create each database's procedure; every policy without a condition is applied
+#once for its permission and every policy with one is applied and adds its condition
+procedureDict = {"rbac": "CREATE PROCEDURE get_allowed(IN principal VARCHAR(191), IN permissions JSON) " + setLength +
+                         "SELECT d.permission, GROUP_CONCAT(CASE WHEN d.con != '' THEN d.con END ORDER BY d.id SEPARATOR ' and ') AS con, "
+                         "SUM(d.con IS NOT NULL AND d.con != '') + MAX(d.con IS NULL OR d.con = '') AS applied "
+                         "FROM (SELECT DISTINCT p.id, p.permission, p.con FROM assignment a JOIN role_closure c ON c.senior = a.r_name JOIN policy p ON p.r_name = c.junior "
+                         "WHERE a.u_name = principal AND " + permissionFilter + ") d GROUP BY d.permission; END;",
+                 "pbac": "CREATE PROCEDURE get_allowed(IN principal VARCHAR(191), IN permissions JSON) " + setLength +
+                         "SELECT d.permission, GROUP_CONCAT(CASE WHEN d.con != '' THEN d.con END ORDER BY d.id SEPARATOR ' and ') AS con, "
+                         "SUM(d.con IS NOT NULL AND d.con != '') + MAX(d.con IS NULL OR d.con = '') AS applied "
+                         "FROM (SELECT p.id, p.permission, p.con FROM purpose u JOIN purpose r ON r.lft <= u.lft AND u.rgt <= r.rgt JOIN policy p ON p.purpose = r.p_name "
+                         "WHERE u.p_name = principal AND " + permissionFilter + ") d GROUP BY d.permission; END;",
+                 "abac": "CREATE PROCEDURE get_allowed(IN principal VARCHAR(191), IN environment JSON, IN permissions JSON) " + setLength +
+                         "SELECT d.permission, GROUP_CONCAT(CASE WHEN " + abacCondition + " THEN d.o_attribute END ORDER BY d.id SEPARATOR ' and ') AS con, "
+                         "SUM(" + abacCondition + ") + MAX(NOT " + abacCondition + ") AS applied "
+                         "FROM (SELECT p.id, p.permission, p.o_attribute, "
+                         "(p.s_attribute IS NULL OR p.s_attribute NOT IN (SELECT s_attribute FROM s_assignment WHERE s_name = principal) "
+                         "OR p.e_attribute IS NULL OR NOT JSON_CONTAINS(environment, JSON_QUOTE(p.e_attribute)) "
+                         "OR p.o_attribute IS NULL OR p.o_attribute NOT IN (SELECT o.o_attribute FROM o_assignment o WHERE o.o_name = p.permission)) AS denied "
+                         "FROM policy p WHERE " + permissionFilter + ") d GROUP BY d.permission HAVING SUM(d.denied) = 0; END;"}
+
+#replaces the get_allowed procedure of the database that the connection uses
+def installProcedures(conn, database):
+    conn.execute(text("DROP PROCEDURE IF EXISTS get_allowed;"))
+    conn.execute(text(procedureDict[database]))
+    conn.commit()
+
+#calls the get_allowed procedure of the database that the connection uses; the principal is a user
+#(rbac), purpose (pbac), or subject (abac); returns the (permission, con, applied) rows
+def callAllowed(conn, database, principal, permissions, environment=None):
+    if database == "abac":
+        result = conn.execute(text("CALL get_allowed(:principal, :environment, :permissions);"), {"principal": principal, "environment": json.dumps(list(environment)), "permissions": json.dumps(list(permissions))})
+    else:
+        result = conn.execute(text("CALL get_allowed(:principal, :permissions);"), {"principal": principal, "permissions": json.dumps(list(permissions))})
+    return result.fetchall()
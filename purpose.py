@@ -0,0 +1,128 @@
+""" Description: This file stores the purpose trees of the pbac permission database as nested sets. A policy
+    that is granted to a purpose also allows every sub-purpose below it, so the purpose table gives each
+    purpose the interval [lft, rgt] of a depth-first numbering of its tree: a purpose is under another
+    purpose exactly when its interval is inside the other's. Checking whether a purpose is allowed by the
+    policies of all of its parent purposes is then one range predicate on the purpose table that an index
+    on (lft, rgt) can serve, instead of walking up the tree. Purposes that are not in any tree (such as
+    the purposes of test cases 1 to 4) are roots of their own tree, so they only match themselves. This
+    file also has the benchmark that measures how long the lookup takes as the trees get deeper and wider.
+"""
+
+import time
+from sqlalchemy import text
+from schema import recreateStatements
+
+#returns the (purpose, parent, lft, rgt, depth) rows of the nested sets of the given purposes
+#and (parent, child) edges; a purpose with more than one parent keeps the first one
+def intervalRows(purposes, edges):
+    children = {}
+    parents = {}
+    for parent, child in edges:
+        if child in parents or child == parent:
+            continue
+        parents[child] = parent
+        if parent not in children:
+            children[parent] = []
+        children[parent].append(child)
+    nodes = list(purposes)
+    seen = set(nodes)
+    for parent, child in edges:
+        for node in (parent, child):
+            if node not in seen:
+                nodes.append(node)
+                seen.add(node)
+    rows = []
+    counter = 0
+    visited = set()
+
+    #the purposes without a parent are numbered first; any purpose that is left is in a
+    #cycle, which is broken at that purpose
+    for root in [node for node in nodes if node not in parents] + nodes:
+        if root in visited:
+            continue
+
+        #depth-first numbering without recursion so that deep trees do not reach the recursion limit
+        stack = [(root, 0, False)]
+        lft = {}
+        while stack:
+            node, depth, done = stack.pop()
+            if done:
+                counter += 1
+                rows.append((node, parents.get(node), lft[node], counter, depth))
+                continue
+            if node in visited:
+                continue
+            visited.add(node)
+            counter += 1
+            lft[node] = counter
+            stack.append((node, depth, True))
+            for child in reversed(children.get(node, [])):
+                stack.append((child, depth + 1, False))
+    return rows
+
+#inserts nested set rows into the purpose table
+def insertIntervals(conn, rows):
+    if rows:
+        conn.execute(text("INSERT INTO purpose (p_name, parent, lft, rgt, depth) VALUES (:name, :parent, :lft, :rgt, :depth);"), [{"name": r[0], "parent": r[1], "lft": r[2], "rgt": r[3], "depth": r[4]} for r in rows])
+
+#rebuilds the purpose table from the purposes of the policies and the (parent, child) edges
+def buildIntervals(conn, edges):
+    result = conn.execute(text("SELECT DISTINCT purpose FROM policy WHERE purpose IS NOT NULL;"))
+    purposes = [row[0] for row in result]
+    conn.execute(text("DELETE FROM purpose;"))
+    insertIntervals(conn, intervalRows(purposes, edges))
+
+#adds a purpose that is not in the purpose table yet as the root of its own tree, after the last interval,
+#so that a policy that is added for it later (see delta.py) is found by the lookups; does not commit
+def addPurpose(conn, purpose):
+    conn.execute(text("INSERT INTO purpose (p_name, parent, lft, rgt, depth) SELECT :purpose, NULL, m.last + 1, m.last + 2, 0 FROM (SELECT COALESCE(MAX(rgt), 0) AS last FROM purpose) m "
+                      "WHERE NOT EXISTS (SELECT 1 FROM purpose WHERE p_name = :purpose);"), {"purpose": purpose})
+
+#reads the (parent, child) edges of the purpose trees from a csv file
+def readEdges(filename):
+    edges = []
+    f = open(filename, "r")
+    for line in f:
+        split = line.rstrip("\n").split(",")
+        if len(split) >= 2 and split[0] and split[1]:
+            edges.append((split[0], split[1]))
+    f.close()
+    return edges
+
+""" fills the given database, which the connection uses and which should not be the live
+    pbac database, with one tree of every (depth, fanout) pair and one policy per purpose,
+    and times the lookup of the permissions of the deepest purposes. Returns a list of
+    (depth, fanout, purposes, average lookup time in seconds) tuples.
+"""
+def benchmarkTrees(conn, database, depths, fanouts, lookups):
+    results = []
+    for depth in depths:
+        for fanout in fanouts:
+            for statement in recreateStatements("pbac", database):
+                conn.execute(text(statement))
+            conn.execute(text("CREATE INDEX idx_lft_rgt ON purpose (lft, rgt);"))
+            edges = []
+            level = ["purpose 0"]
+            count = 1
+            for d in range(depth):
+                next = []
+                for parent in level:
+                    for k in range(fanout):
+                        child = "purpose " + str(count)
+                        count += 1
+                        edges.append((parent, child))
+                        next.append(child)
+                level = next
+            purposes = ["purpose 0"] + [child for parent, child in edges]
+            conn.execute(text("INSERT INTO policy (id, purpose, permission, con) VALUES (:id, :purpose, 's_name', '');"), [{"id": i, "purpose": purposes[i]} for i in range(len(purposes))])
+            insertIntervals(conn, intervalRows(purposes, edges))
+            conn.commit()
+
+            #the deepest purposes have the most parent purposes to match
+            start = time.time()
+            for i in range(lookups):
+                result = conn.execute(text("select p.permission, p.con from purpose u join purpose q on q.lft <= u.lft and u.rgt <= q.rgt join policy p on p.purpose = q.p_name where u.p_name = :purpose"), {"purpose": level[i % len(level)]})
+                result.fetchall()
+            end = time.time()
+            results.append((depth, fanout, len(purposes), (end - start) / lookups))
+    return results
@@ -0,0 +1,183 @@
+""" Description: This file pushes the policies of an access control database into the TPC-H queries, so that the
+    business database decides the permissions and runs the query in one statement instead of the driver
+    deciding them first and rewriting the query with the result. Every selection item of a query is masked
+    with a CASE that returns it only if all the permissions of the item are allowed, and every condition that
+    a policy of the query's permissions can add is placed in the query as "(not applied or condition)", so
+    it filters the rows only if the principal has that policy. Both tests are semi-joins (EXISTS) against the
+    policy tables of the rbac, pbac, or abac database, which the business database reads across databases
+    (the embedded backends attach the file, see attachDatabase in backend.py), and they only depend on the
+    principal, which is a bound parameter, so each query is rewritten once for every principal. The
+    decisions are the same as the check functions of driver.py, but a permission that is not allowed is
+    returned as NULL instead of being removed from the query, so a query that joins on a denied item returns
+    no rows, and a query with no allowed items is still executed.
+"""
+
+import re
+from sqlalchemy import bindparam, text
+from backend import backendName
+
+#the policies that apply to the principal, which is bound as :principal, in each database
+appliedPolicies = {"rbac": "SELECT 1 FROM rbac.assignment a JOIN rbac.role_closure c ON c.senior = a.r_name JOIN rbac.policy p ON p.r_name = c.junior WHERE a.u_name = :principal",
+                   "pbac": "SELECT 1 FROM pbac.purpose u JOIN pbac.purpose r ON r.lft <= u.lft AND u.rgt <= r.rgt JOIN pbac.policy p ON p.purpose = r.p_name WHERE u.p_name = :principal"}
+
+#the abac policies of a permission that the subject (:principal), the environment (:environment),
+#or the permission's object attributes do not match; a permission is allowed if it has policies
+#and none of them is denied (see evaluateABAC in driver.py)
+deniedPolicies = "SELECT 1 FROM abac.policy p WHERE p.permission = {} AND (p.s_attribute IS NULL OR p.s_attribute NOT IN (SELECT s.s_attribute FROM abac.s_assignment s WHERE s.s_name = :principal) " \
+                 "OR p.e_attribute IS NULL OR p.e_attribute NOT IN :environment " \
+                 "OR p.o_attribute IS NULL OR p.o_attribute NOT IN (SELECT o.o_attribute FROM abac.o_assignment o WHERE o.o_name = p.permission))"
+
+#returns a string as a SQL literal
+def quote(value):
+    return "'" + value.replace("'", "''") + "'"
+
+#returns True if an abac object attribute is a condition, the same test as checkABAC
+def isCondition(attribute):
+    return attribute != None and attribute != "any" and ("<" in attribute or ">" in attribute or "=" in attribute or "between" in attribute)
+
+#returns the test of whether the principal is allowed a permission
+def allowedTest(database, permission):
+    if database == "abac":
+        return "(EXISTS (SELECT 1 FROM abac.policy p WHERE p.permission = {0}) AND NOT EXISTS ({1}))".format(quote(permission), deniedPolicies.format(quote(permission)))
+    return "EXISTS ({} AND p.permission = {})".format(appliedPolicies[database], quote(permission))
+
+#returns the test of whether a policy of one of the permissions adds the condition for the principal
+def appliedTest(database, condition, permissions):
+    if database == "abac":
+        tests = []
+        for permission in permissions:
+            tests.append("({} AND EXISTS (SELECT 1 FROM abac.policy p WHERE p.permission = {} AND p.o_attribute = {}))".format(allowedTest(database, permission), quote(permission), quote(condition)))
+        return "(" + " OR ".join(tests) + ")"
+    return "EXISTS ({} AND p.permission IN ({}) AND p.con = {})".format(appliedPolicies[database], ", ".join(quote(permission) for permission in permissions), quote(condition))
+
+#returns the conditions that the policies of the permissions can add, in the order of the policies,
+#each with the permissions whose policies add it
+def getConditions(conn, database, permissions):
+    column = "o_attribute" if database == "abac" else "con"
+    query = "SELECT permission, {0} AS con FROM policy WHERE permission IN :permissions AND {0} IS NOT NULL ORDER BY id;".format(column)
+    result = conn.execute(text(query).bindparams(bindparam("permissions", expanding=True)), {"permissions": list(permissions)})
+    conditions = {}
+    for row in result:
+        if row.con == "" or (database == "abac" and not isCondition(row.con)):
+            continue
+        if row.con not in conditions:
+            conditions[row.con] = []
+        if row.permission not in conditions[row.con]:
+            conditions[row.con].append(row.permission)
+    return list(conditions.items())
+
+#returns the filter that applies a condition to the rows only if the principal has one of its policies;
+#the nation columns are renamed in the queries that join nation as n1, as the check functions do
+def conditionFilter(database, condition, permissions, query):
+    expression = condition
+    if "n1" in query and "n_" in expression:
+        expression = expression.replace("n_", "n1.n_")
+    return "(NOT {} OR {})".format(appliedTest(database, condition, permissions), expression)
+
+#splits a list of expressions at the commas that are not inside parentheses or quotes
+def splitItems(expressions):
+    items = []
+    depth = 0
+    quoted = False
+    start = 0
+    for index in range(len(expressions)):
+        character = expressions[index]
+        if character == "'":
+            quoted = not quoted
+        elif quoted:
+            continue
+        elif character == "(":
+            depth += 1
+        elif character == ")":
+            depth -= 1
+        elif character == "," and depth == 0:
+            items.append(expressions[start:index].strip())
+            start = index + 1
+    items.append(expressions[start:].strip())
+    return items
+
+#returns where the select list of a statement starts and ends, or None if it has no select;
+#the list ends at the first "from" that is not inside parentheses or quotes
+def findSelect(statement):
+    start = statement.find("select ")
+    if start == -1:
+        return None
+    start += len("select ")
+    depth = 0
+    quoted = False
+    for index in range(start, len(statement)):
+        character = statement[index]
+        if character == "'":
+            quoted = not quoted
+        elif quoted:
+            continue
+        elif character == "(":
+            depth += 1
+        elif character == ")":
+            depth -= 1
+        elif depth == 0 and statement.startswith(" from ", index):
+            return start, index
+    return None
+
+""" masks every item of the select list of a statement with the permissions whose selection
+    items (selectList in driver.py) include it, so that the item is NULL unless they are all
+    allowed. Items that are not part of any permission's selection items are left as they are.
+"""
+def maskSelect(statement, database, permissions, selections):
+    bounds = findSelect(statement)
+    if bounds == None:
+        return statement
+    masked = []
+    for item in splitItems(statement[bounds[0]:bounds[1]]):
+        tests = []
+        for x in range(len(permissions)):
+            if item in splitItems(selections[x].strip().rstrip(",")):
+                tests.append(allowedTest(database, permissions[x]))
+        if not tests:
+            masked.append(item)
+            continue
+        if " as " in item:
+            expression, alias = item.rsplit(" as ", 1)
+        else:
+            expression, alias = item, item if re.fullmatch(r"\w+", item) else None
+        item = "case when {} then {} end".format(" and ".join(tests), expression)
+        if alias != None:
+            item = item + " as " + alias
+        masked.append(item)
+    return statement[:bounds[0]] + ", ".join(masked) + statement[bounds[1]:]
+
+#returns the statement that tests whether any of the permissions is allowed, as runAC does not
+#execute a query when none of its selection items remain
+def guardSelect(database, permissions):
+    tests = [allowedTest(database, permission) for permission in permissions]
+    return "select case when {} then 1 else 0 end as allowed;".format(" or ".join(tests))
+
+#returns a pushed statement as the backend runs it; SQLite only lets a temporary view read an attached database
+def localView(statement):
+    if backendName == "sqlite" and statement.startswith("create view "):
+        return statement.replace("create view ", "create temp view ", 1)
+    return statement
+
+#returns the text of a pushed statement with its parameters bound; a view cannot have parameters,
+#so they are written into the statements that are not a select as literals
+def pushedText(database, statement, parameters):
+    if not statement.startswith("select"):
+        for name in parameters:
+            value = parameters[name]
+            if isinstance(value, list):
+                literal = "(" + ", ".join(quote(v) for v in value) + ")"
+            else:
+                literal = quote(value)
+            statement = statement.replace(":" + name, literal.replace(":", "\\:"))
+        return text(statement)
+    if ":environment" in statement:
+        return text(statement).bindparams(bindparam("environment", expanding=True))
+    return text(statement)
+
+#returns the parameters of the pushed statements for a (user/subject, purpose) principal
+def pushedParameters(database, principal, environment):
+    if database == "abac":
+        return {"principal": principal[0], "environment": list(environment)}
+    if database == "rbac":
+        return {"principal": principal[0]}
+    return {"principal": principal[1]}
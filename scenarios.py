@@ -0,0 +1,978 @@
+""" Description: This file turns the scenario-based policy simulators from the notebooks in
+    "Policy Generator(Alternet approach)" (TPCH_ABAC_Simulator, TPCH_RBAC_Simulator, and the PBAC policies
+    dictionary) into a generator that can be imported and that scales to millions of policies. Instead of
+    writing one policy per run, the generator simulates any number of scenarios and writes the policies in
+    batches to the same csv files that policies.py loads into the permission databases (test case 7). The
+    next policy id of each file is found by reading only the end of the file instead of the whole file,
+    and the user names that the notebooks got from Faker for every row are drawn from a pool that is
+    generated once. Faker is optional; without it the pool is filled with generated names.
+    The scenario permissions (for example "AVG o_totalprice") are written in the same form as the
+    permission list of the queries ("avg(o_totalprice)").
+"""
+
+import os
+import random
+from workload import baseEnvironment
+
+#scenarios from ABAC.ipynb; each gives the attributes of a user and the data they work with
+abacScenarios = {
+    "Financial Health Overview": {
+        "attributes": {
+            "data_sensitivity": "high",
+            "user_clearance": "financial_analyst",
+            "business_unit": "finance",
+            "period": "Q1_2023"
+        }
+    },
+    "Inventory Analysis and Optimization": {
+        "attributes": {
+            "data_sensitivity": "medium",
+            "user_clearance": "inventory_manager",
+            "business_unit": "inventory",
+            "stock_condition": "critical"
+        }
+    },
+    "Market Segmentation Analysis": {
+        "attributes": {
+            "data_sensitivity": "medium",
+            "user_clearance": "marketing_analyst",
+            "business_unit": "marketing",
+            "market_segment": "AUTOMOBILE"
+        }
+    },
+    "High-Value Customer Identification": {
+        "attributes": {
+            "data_sensitivity": "high",
+            "user_clearance": "marketing_analyst",
+            "business_unit": "marketing",
+            "customer_revenue": "high"
+        }
+    },
+    "Supplier Financial Health Assessment": {
+        "attributes": {
+            "data_sensitivity": "medium",
+            "user_clearance": "procurement_specialist",
+            "business_unit": "procurement",
+            "supplier_status": "active"
+        }
+    },
+    "Compliance Audit": {
+        "attributes": {
+            "data_sensitivity": "high",
+            "user_clearance": "compliance_officer",
+            "business_unit": "compliance",
+            "compliance_status": "pending"
+        }
+    },
+    "Revenue Stream Analysis": {
+        "attributes": {
+            "data_sensitivity": "high",
+            "user_clearance": "cfo",
+            "business_unit": "finance",
+            "revenue_threshold": "high"
+        }
+    },
+    "Quarterly Revenue Trends": {
+        "attributes": {
+            "data_sensitivity": "medium",
+            "user_clearance": "financial_analyst",
+            "business_unit": "finance",
+            "financial_quarter": "Q2_2023"
+        }
+    },
+    "Supplier Reliability Check": {
+        "attributes": {
+            "data_sensitivity": "low",
+            "user_clearance": "procurement_specialist",
+            "business_unit": "procurement",
+            "supplier_performance": "high"
+        }
+    },
+    "Operational Efficiency Review": {
+        "attributes": {
+            "data_sensitivity": "medium",
+            "user_clearance": "operations_manager",
+            "business_unit": "operations",
+            "efficiency_rating": "optimal"
+        }
+    },
+    "Product Profitability Analysis": {
+        "attributes": {
+            "data_sensitivity": "medium",
+            "user_clearance": "product_manager",
+            "business_unit": "product_development",
+            "profitability_index": "high"
+        }
+    },
+    "Resource Allocation Planning": {
+        "attributes": {
+            "data_sensitivity": "low",
+            "user_clearance": "resource_manager",
+            "business_unit": "resource_management",
+            "resource_availability": "sufficient"
+        }
+    },
+    "Quality Control Analysis": {
+        "attributes": {
+            "data_sensitivity": "medium",
+            "user_clearance": "quality_manager",
+            "business_unit": "quality_control",
+            "quality_standards": "high"
+        }
+    },
+    "Strategic Planning Session": {
+        "attributes": {
+            "data_sensitivity": "low",
+            "user_clearance": "strategy_analyst",
+            "business_unit": "strategic_planning",
+            "planning_phase": "initial"
+        }
+    },
+    "Supply Chain Disruption Analysis": {
+        "attributes": {
+            "data_sensitivity": "high",
+            "user_clearance": "supply_chain_manager",
+            "business_unit": "supply_chain",
+            "supply_chain_status": "stable"
+        }
+    },
+    "End of Year Sales Review": {
+        "attributes": {
+            "data_sensitivity": "medium",
+            "user_clearance": "regional_sales_manager",
+            "business_unit": "sales",
+            "sales_period": "Q4_2023"
+        }
+    },
+    "Global Demand Forecasting": {
+        "attributes": {
+            "data_sensitivity": "medium",
+            "user_clearance": "market_research_analyst",
+            "business_unit": "marketing",
+            "forecast_period": "2024"
+        }
+    },
+    "Operational Risk Assessment": {
+        "attributes": {
+            "data_sensitivity": "high",
+            "user_clearance": "risk_manager",
+            "business_unit": "risk_management",
+            "risk_level": "critical"
+        }
+    },
+    "Customer Loyalty Program Review": {
+        "attributes": {
+            "data_sensitivity": "low",
+            "user_clearance": "customer_relationship_manager",
+            "business_unit": "customer_service",
+            "program_effectiveness": "high"
+        }
+    },
+    "Regional Performance and Tax Analysis": {
+        "attributes": {
+            "data_sensitivity": "high",
+            "user_clearance": "tax_analyst",
+            "business_unit": "finance",
+            "region": "EUROPE"
+        }
+    },
+    "Supplier Contract Negotiation": {
+        "attributes": {
+            "data_sensitivity": "medium",
+            "user_clearance": "procurement_specialist",
+            "business_unit": "procurement",
+            "contract_renewal_phase": "negotiation"
+        }
+    },
+    "IT Infrastructure Upgrade": {
+        "attributes": {
+            "data_sensitivity": "high",
+            "user_clearance": "it_manager",
+            "business_unit": "information_technology",
+            "upgrade_phase": "planning"
+        }
+    },
+    "Employee Performance Review": {
+        "attributes": {
+            "data_sensitivity": "low",
+            "user_clearance": "hr_manager",
+            "business_unit": "human_resources",
+            "review_cycle": "2023"
+        }
+    },
+    "Corporate Strategy Development": {
+        "attributes": {
+            "data_sensitivity": "high",
+            "user_clearance": "chief_strategy_officer",
+            "business_unit": "executive",
+            "strategic_initiatives": "expansion"
+        }
+    },
+    "New Product Launch Analysis": {
+        "attributes": {
+            "data_sensitivity": "medium",
+            "user_clearance": "product_manager",
+            "business_unit": "product_development",
+            "product_launch_date": "Q3_2023"
+        }
+    }
+}
+
+#scenarios from RBAC (2).ipynb; each gives the permissions and row conditions of one or more roles
+rbacScenarios = {
+    "Financial Health Overview": {
+        "roles": {
+            "Financial Analyst": {
+                "permissions": {
+                    "ORDERS": [
+                        "SELECT o_totalprice",
+                        "AVG o_totalprice"
+                    ],
+                    "LINEITEM": [
+                        "SELECT l_extendedprice"
+                    ]
+                },
+                "row_conditions": "o_orderdate >= '2022-01-01'"
+            }
+        }
+    },
+    "Quarterly Revenue Trends": {
+        "roles": {
+            "Financial Analyst": {
+                "permissions": {
+                    "ORDERS": [
+                        "SUM o_totalprice",
+                        "COUNT o_orderid"
+                    ],
+                    "LINEITEM": [
+                        "AVG l_discount"
+                    ]
+                },
+                "row_conditions": "o_orderdate between '2022-01-01' and '2022-03-31'"
+            }
+        }
+    },
+    "Inventory Analysis and Optimization": {
+        "roles": {
+            "Inventory Manager": {
+                "permissions": {
+                    "PART": [
+                        "SELECT p_partkey"
+                    ],
+                    "PARTSUPP": [
+                        "AVG ps_supplycost"
+                    ]
+                },
+                "row_conditions": "p_type = 'critical'"
+            }
+        }
+    },
+    "Critical Stock Levels": {
+        "roles": {
+            "Inventory Manager": {
+                "permissions": {
+                    "PARTSUPP": [
+                        "SELECT ps_availqty",
+                        "SELECT ps_partkey"
+                    ],
+                    "PART": [
+                        "SELECT p_name"
+                    ]
+                },
+                "row_conditions": "ps_availqty < 50"
+            }
+        }
+    },
+    "Market Segmentation Analysis": {
+        "roles": {
+            "Marketing Analyst": {
+                "permissions": {
+                    "CUSTOMER": [
+                        "SELECT c_mktsegment",
+                        "COUNT c_custkey"
+                    ],
+                    "ORDERS": [
+                        "SELECT o_orderkey"
+                    ]
+                },
+                "row_conditions": "c_mktsegment = 'AUTOMOBILE'"
+            }
+        }
+    },
+    "High-Value Customer Identification": {
+        "roles": {
+            "Marketing Analyst": {
+                "permissions": {
+                    "CUSTOMER": [
+                        "SELECT c_name",
+                        "SELECT c_revenue"
+                    ],
+                    "ORDERS": [
+                        "SELECT o_totalprice"
+                    ]
+                },
+                "row_conditions": "c_revenue > 10000"
+            }
+        }
+    },
+    "Supplier Financial Health Assessment": {
+        "roles": {
+            "Procurement Specialist": {
+                "permissions": {
+                    "SUPPLIER": [
+                        "SELECT s_acctbal",
+                        "SUM s_acctbal"
+                    ],
+                    "PARTSUPP": [
+                        "SELECT ps_supplycost"
+                    ]
+                },
+                "row_conditions": "s_acctbal > 5000"
+            }
+        }
+    },
+    "Supplier Reliability Check": {
+        "roles": {
+            "Procurement Specialist": {
+                "permissions": {
+                    "SUPPLIER": [
+                        "SELECT s_performance"
+                    ],
+                    "PARTSUPP": [
+                        "SELECT ps_partkey"
+                    ]
+                },
+                "row_conditions": "s_performance >= 8"
+            }
+        }
+    },
+    "Regional Performance and Tax Analysis": {
+        "roles": {
+            "Tax Analyst": {
+                "permissions": {
+                    "ORDERS": [
+                        "SELECT o_region",
+                        "SUM o_tax"
+                    ],
+                    "CUSTOMER": [
+                        "SELECT c_region"
+                    ]
+                },
+                "row_conditions": "o_region = 'EUROPE'"
+            }
+        }
+    },
+    "End of Year Sales Review": {
+        "roles": {
+            "Regional Sales Manager": {
+                "permissions": {
+                    "ORDERS": [
+                        "SUM o_totalprice",
+                        "SELECT o_orderdate"
+                    ],
+                    "LINEITEM": [
+                        "SELECT l_quantity"
+                    ]
+                },
+                "row_conditions": "o_orderdate between '2022-10-01' and '2022-12-31'"
+            }
+        }
+    },
+    "Global Demand Forecasting": {
+        "roles": {
+            "Market Research Analyst": {
+                "permissions": {
+                    "ORDERS": [
+                        "SELECT o_shippriority",
+                        "COUNT o_orderid"
+                    ],
+                    "CUSTOMER": [
+                        "SELECT c_nationkey"
+                    ]
+                },
+                "row_conditions": "o_orderdate >= '2022-01-01'"
+            }
+        }
+    },
+    "Operational Efficiency Review": {
+        "roles": {
+            "Operations Manager": {
+                "permissions": {
+                    "LINEITEM": [
+                        "SUM l_quantity",
+                        "AVG l_extendedprice"
+                    ],
+                    "ORDERS": [
+                        "COUNT o_orderid"
+                    ]
+                },
+                "row_conditions": "l_shipdate <= '2022-12-31'"
+            }
+        }
+    },
+    "Compliance Audit": {
+        "roles": {
+            "Compliance Officer": {
+                "permissions": {
+                    "SUPPLIER": [
+                        "SELECT s_comment",
+                        "SELECT s_name"
+                    ],
+                    "PART": [
+                        "SELECT p_name"
+                    ]
+                },
+                "row_conditions": "s_acctbal < 0"
+            }
+        }
+    },
+    "Product Profitability Analysis": {
+        "roles": {
+            "Product Manager": {
+                "permissions": {
+                    "PART": [
+                        "SELECT p_partkey",
+                        "AVG ps_supplycost"
+                    ],
+                    "PARTSUPP": [
+                        "SELECT ps_partkey"
+                    ]
+                },
+                "row_conditions": "p_size between 1 and 50"
+            }
+        }
+    },
+    "Customer Loyalty Program Review": {
+        "roles": {
+            "Customer Relationship Manager": {
+                "permissions": {
+                    "CUSTOMER": [
+                        "SELECT c_name",
+                        "SUM c_acctbal"
+                    ],
+                    "ORDERS": [
+                        "COUNT o_orderid"
+                    ]
+                },
+                "row_conditions": "c_acctbal > 5000"
+            }
+        }
+    },
+    "Resource Allocation Planning": {
+        "roles": {
+            "Resource Manager": {
+                "permissions": {
+                    "PARTSUPP": [
+                        "SELECT ps_supplycost",
+                        "SELECT ps_availqty"
+                    ],
+                    "SUPPLIER": [
+                        "SELECT s_nationkey"
+                    ]
+                },
+                "row_conditions": "ps_availqty > 100"
+            }
+        }
+    },
+    "Quality Control Analysis": {
+        "roles": {
+            "Quality Assurance Manager": {
+                "permissions": {
+                    "LINEITEM": [
+                        "SELECT l_quality",
+                        "AVG l_quality"
+                    ],
+                    "ORDERS": [
+                        "SELECT o_orderstatus"
+                    ]
+                },
+                "row_conditions": "l_quality < 'B'"
+            }
+        }
+    },
+    "Revenue Stream Analysis": {
+        "roles": {
+            "Chief Financial Officer": {
+                "permissions": {
+                    "ORDERS": [
+                        "SUM o_totalprice"
+                    ],
+                    "CUSTOMER": [
+                        "SELECT c_credit"
+                    ]
+                },
+                "row_conditions": "o_totalprice > 10000"
+            }
+        }
+    },
+    "Strategic Planning Session": {
+        "roles": {
+            "Strategy Analyst": {
+                "permissions": {
+                    "NATION": [
+                        "SELECT n_name",
+                        "COUNT n_regionkey"
+                    ],
+                    "REGION": [
+                        "SELECT r_name"
+                    ]
+                },
+                "row_conditions": "n_regionkey =r_regionkey"
+            }
+        }
+    },
+    "Supply Chain Disruption Analysis": {
+        "roles": {
+            "Supply Chain Manager": {
+                "permissions": {
+                    "SUPPLIER": [
+                        "SELECT s_name",
+                        "COUNT s_suppkey"
+                    ],
+                    "PARTSUPP": [
+                        "SELECT ps_partkey"
+                    ]
+                },
+                "row_conditions": ".s_status = 'active'"
+            }
+        }
+    }
+}
+
+#scenarios from PBAC (1).ipynb; each gives a purpose and its permissions and conditions
+pbacScenarios = {
+    "Financial Health Overview": {
+        "purpose": "auditing",
+        "permissions": [
+            "SELECT o_totalprice",
+            "AVG o_totalprice",
+            "SELECT l_extendedprice"
+        ],
+        "conditions": [
+            "o_orderdate >= '2022-01-01'",
+            "",
+            ""
+        ]
+    },
+    "Quarterly Revenue Trends": {
+        "purpose": "financial review",
+        "permissions": [
+            "SUM o_totalprice",
+            "COUNT o_orderid",
+            "AVG l_discount"
+        ],
+        "conditions": [
+            "o_orderdate between '2022-01-01' and '2022-03-31'",
+            "",
+            ""
+        ]
+    },
+    "Inventory Analysis and Optimization": {
+        "purpose": "inventory management",
+        "permissions": [
+            "SELECT p_partkey",
+            "AVG ps_supplycost"
+        ],
+        "conditions": [
+            "",
+            "p_type = 'critical'"
+        ]
+    },
+    "Critical Stock Levels": {
+        "purpose": "inventory control",
+        "permissions": [
+            "SELECT ps_availqty",
+            "SELECT ps_partkey",
+            "SELECT p_name"
+        ],
+        "conditions": [
+            "ps_availqty < 50",
+            "",
+            ""
+        ]
+    },
+    "Market Segmentation Analysis": {
+        "purpose": "market analysis",
+        "permissions": [
+            "SELECT c_mktsegment",
+            "COUNT c_custkey",
+            "SELECT o_orderkey"
+        ],
+        "conditions": [
+            "c_mktsegment = 'AUTOMOBILE'",
+            "",
+            ""
+        ]
+    },
+    "Supplier Financial Health Assessment": {
+        "purpose": "supplier assessment",
+        "permissions": [
+            "SELECT s_acctbal",
+            "SUM s_acctbal",
+            "SELECT ps_supplycost"
+        ],
+        "conditions": [
+            "s_acctbal > 5000",
+            "",
+            ""
+        ]
+    },
+    "Supplier Reliability Check": {
+        "purpose": "supplier verification",
+        "permissions": [
+            "SELECT s_performance",
+            "SELECT ps_partkey"
+        ],
+        "conditions": [
+            "s_performance >= 8",
+            ""
+        ]
+    },
+    "High-Value Customer Identification": {
+        "purpose": "customer management",
+        "permissions": [
+            "SELECT c_name",
+            "SELECT c_revenue",
+            "SELECT o_totalprice"
+        ],
+        "conditions": [
+            "c_revenue > 10000",
+            "",
+            ""
+        ]
+    },
+    "Regional Performance and Tax Analysis": {
+        "purpose": "regional auditing",
+        "permissions": [
+            "SELECT o_region",
+            "SUM o_tax",
+            "SELECT c_region"
+        ],
+        "conditions": [
+            "o_region = 'EUROPE'",
+            "",
+            ""
+        ]
+    },
+    "End of Year Sales Review": {
+        "purpose": "sales analysis",
+        "permissions": [
+            "SUM o_totalprice",
+            "SELECT o_orderdate",
+            "SELECT l_quantity"
+        ],
+        "conditions": [
+            "o_orderdate between '2022-10-01' and '2022-12-31'",
+            "",
+            ""
+        ]
+    },
+    "Global Demand Forecasting": {
+        "purpose": "demand forecasting",
+        "permissions": [
+            "SELECT o_shippriority",
+            "COUNT o_orderid",
+            "SELECT c_nationkey"
+        ],
+        "conditions": [
+            "o_orderdate >= '2022-01-01'",
+            "",
+            ""
+        ]
+    },
+    "Operational Efficiency Review": {
+        "purpose": "operations review",
+        "permissions": [
+            "SUM l_quantity",
+            "AVG l_extendedprice",
+            "COUNT o_orderid"
+        ],
+        "conditions": [
+            "l_shipdate <= '2022-12-31'",
+            "",
+            ""
+        ]
+    },
+    "Compliance Audit": {
+        "purpose": "compliance auditing",
+        "permissions": [
+            "SELECT s_comment",
+            "SELECT s_name",
+            "SELECT p_name"
+        ],
+        "conditions": [
+            "s_acctbal < 0",
+            "",
+            ""
+        ]
+    },
+    "Product Profitability Analysis": {
+        "purpose": "profitability analysis",
+        "permissions": [
+            "SELECT p_partkey",
+            "AVG ps_supplycost",
+            "SELECT ps_partkey"
+        ],
+        "conditions": [
+            "p_size between 1 and 50",
+            "",
+            ""
+        ]
+    },
+    "Customer Loyalty Program Review": {
+        "purpose": "loyalty program review",
+        "permissions": [
+            "SELECT c_name",
+            "SUM c_acctbal",
+            "COUNT o_orderid"
+        ],
+        "conditions": [
+            "c_acctbal > 5000",
+            "",
+            ""
+        ]
+    },
+    "Resource Allocation Planning": {
+        "purpose": "resource planning",
+        "permissions": [
+            "SELECT ps_supplycost",
+            "SELECT ps_availqty",
+            "SELECT s_nationkey"
+        ],
+        "conditions": [
+            "ps_availqty > 100",
+            "",
+            ""
+        ]
+    },
+    "Quality Control Analysis": {
+        "purpose": "quality control",
+        "permissions": [
+            "SELECT l_quality",
+            "AVG l_quality",
+            "SELECT o_orderstatus"
+        ],
+        "conditions": [
+            "l_quality < 'B'",
+            "",
+            ""
+        ]
+    },
+    "Revenue Stream Analysis": {
+        "purpose": "financial analysis",
+        "permissions": [
+            "SUM o_totalprice",
+            "SELECT c_credit"
+        ],
+        "conditions": [
+            "o_totalprice > 10000",
+            ""
+        ]
+    },
+    "Strategic Planning Session": {
+        "purpose": "strategic planning",
+        "permissions": [
+            "SELECT n_name",
+            "COUNT n_regionkey",
+            "SELECT r_name"
+        ],
+        "conditions": [
+            "n_regionkey = r_regionkey",
+            "",
+            ""
+        ]
+    },
+    "Supply Chain Disruption Analysis": {
+        "purpose": "supply chain management",
+        "permissions": [
+            "SELECT s_name",
+            "COUNT s_suppkey",
+            "SELECT ps_partkey"
+        ],
+        "conditions": [
+            "s_status = 'active'",
+            "",
+            ""
+        ]
+    }
+}
+
+#returns the permission in the form of the query permission lists for a scenario operation
+#such as "SELECT o_totalprice" or "AVG o_totalprice"
+def toPermission(operation):
+    parts = operation.split()
+    if len(parts) == 1:
+        return parts[0]
+    if parts[0].upper() == "SELECT":
+        return parts[1]
+    return parts[0].lower() + "(" + parts[1] + ")"
+
+#returns the next id after the last row of a csv file whose first column is the id, reading
+#only the end of the file; returns start if the file does not exist or has no rows
+def getNextID(filename, start):
+    try:
+        f = open(filename, "rb")
+    except FileNotFoundError:
+        return start
+    f.seek(0, os.SEEK_END)
+    end = f.tell()
+    position = end
+    data = b""
+    while position > 0:
+        size = min(4096, position)
+        position -= size
+        f.seek(position)
+        data = f.read(size) + data
+        lines = data.strip().split(b"\n")
+        if len(lines) > 1 or position == 0:
+            break
+    f.close()
+    last = data.strip().split(b"\n")[-1]
+    if not last:
+        return start
+    try:
+        return int(last.split(b",")[0]) + 1
+    except ValueError:
+        return start
+
+#gives out increasing policy ids, starting after the last id in a policy file
+class IdAllocator:
+    def __init__(self, filename, start=0):
+        self.id = getNextID(filename, start)
+
+    def next(self):
+        id = self.id
+        self.id += 1
+        return id
+
+#returns a list of user names that is generated once and then drawn from, instead of
+#calling Faker for every row
+def namePool(size, seed=0):
+    try:
+        from faker import Faker
+        fake = Faker()
+        fake.seed_instance(seed)
+        return sorted(set(fake.name() for i in range(size)))
+    except ImportError:
+        return ["user " + str(i) for i in range(size)]
+
+#collects lines for a csv file and writes them in batches
+class BatchWriter:
+    def __init__(self, filename, batchSize):
+        self.file = open(filename, "a")
+        self.batchSize = batchSize
+        self.lines = []
+
+    def write(self, *values):
+        self.lines.append(",".join([str(v) for v in values]) + ",\n")
+        if len(self.lines) >= self.batchSize:
+            self.flush()
+
+    def flush(self):
+        self.file.writelines(self.lines)
+        self.lines = []
+
+    def close(self):
+        self.flush()
+        self.file.close()
+
+""" simulates scenarios of all three models and writes the users, roles, attributes, and
+    policies to the csv files that policies.py loads. Each simulated scenario gives a new
+    user the scenario's role (rbac), clearance (abac), and purpose (pbac) and writes a
+    policy for every permission of the scenario. For abac, the scenario's permissions are
+    taken from the pbac scenario with the same name, the row condition becomes the object
+    attribute, and the environment attribute is one of the attributes that the driver's abac
+    check uses, since the notebooks' simulated time and location are not stored in the
+    databases. Returns the number of policies written for each model.
+"""
+class ScenarioGenerator:
+    def __init__(self, seed=0, poolSize=10000, batchSize=10000):
+        self.rng = random.Random(seed)
+        self.names = namePool(poolSize, seed)
+        self.batchSize = batchSize
+        self.rbacIDs = IdAllocator("rbacPolicy.csv", 0)
+        self.abacIDs = IdAllocator("abacPolicy.csv", 1)
+        self.pbacIDs = IdAllocator("pbacPolicy.csv", 0)
+        self.scenarioNames = list(rbacScenarios)
+
+        #(permission, condition) pairs of each scenario for every model
+        self.grants = {}
+        for scenario in rbacScenarios:
+            self.grants[scenario] = {}
+            for role, details in rbacScenarios[scenario]["roles"].items():
+                grants = []
+                for table, operations in details["permissions"].items():
+                    for operation in operations:
+                        grants.append((toPermission(operation), details["row_conditions"]))
+                self.grants[scenario][role] = grants
+        self.purposes = {}
+        for scenario, details in pbacScenarios.items():
+            grants = []
+            for i in range(len(details["permissions"])):
+                condition = details["conditions"][i] if i < len(details["conditions"]) else ""
+                grants.append((toPermission(details["permissions"][i]), condition))
+            self.purposes[scenario] = (details["purpose"], grants)
+
+    def generate(self, num):
+        files = {}
+        for name in ["rbacUser", "rbacRole", "rbacAssignment", "rbacPolicy", "abacSubject", "abacSAttribute", "abacSAssignment",
+                     "abacObject", "abacOAttribute", "abacOAssignment", "abacPolicy", "pbacPolicy", "principals"]:
+            files[name] = BatchWriter(name + ".csv", self.batchSize)
+        counts = {"rbac": 0, "abac": 0, "pbac": 0}
+        roles = set()
+        clearances = set()
+        objects = set()
+
+        for n in range(num):
+            scenario = self.rng.choice(self.scenarioNames)
+            user = self.rng.choice(self.names) + " " + str(n)
+
+            #rbac: one random role of the scenario, as in simulate_scenario
+            role = self.rng.choice(list(self.grants[scenario]))
+            files["rbacUser"].write(user)
+            files["rbacAssignment"].write(user, role)
+            if role not in roles:
+                files["rbacRole"].write(role)
+                roles.add(role)
+            for permission, condition in self.grants[scenario][role]:
+                files["rbacPolicy"].write(self.rbacIDs.next(), role, permission, condition)
+                counts["rbac"] += 1
+
+            #pbac: the purpose of the scenario with the same name, or a random one
+            if scenario in self.purposes:
+                purpose, grants = self.purposes[scenario]
+            else:
+                purpose, grants = self.purposes[self.rng.choice(list(self.purposes))]
+            for permission, condition in grants:
+                files["pbacPolicy"].write(self.pbacIDs.next(), purpose, permission, condition)
+                counts["pbac"] += 1
+            files["principals"].write(user, purpose)
+
+            #abac: the clearance of the scenario with the same name, or a random one
+            if scenario in abacScenarios:
+                attributes = abacScenarios[scenario]["attributes"]
+            else:
+                attributes = abacScenarios[self.rng.choice(list(abacScenarios))]["attributes"]
+            clearance = attributes["user_clearance"]
+            files["abacSubject"].write(user)
+            files["abacSAssignment"].write(user, clearance)
+            if clearance not in clearances:
+                files["abacSAttribute"].write(clearance)
+                clearances.add(clearance)
+            for permission, condition in grants:
+                oAttribute = condition if condition else "admin owner"
+                if (permission, oAttribute) not in objects:
+                    if permission not in objects:
+                        files["abacObject"].write(permission)
+                        objects.add(permission)
+                    if oAttribute not in objects:
+                        files["abacOAttribute"].write(oAttribute)
+                        objects.add(oAttribute)
+                    files["abacOAssignment"].write(permission, oAttribute)
+                    objects.add((permission, oAttribute))
+                files["abacPolicy"].write(self.abacIDs.next(), permission, clearance, oAttribute, self.rng.choice(baseEnvironment))
+                counts["abac"] += 1
+
+        for f in files.values():
+            f.close()
+        return counts
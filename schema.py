@@ -0,0 +1,150 @@
+""" Description: This file stores the table definitions of the abac, rbac, and pbac permission databases
+    that are drawn in the ER diagrams (ABAC/RBAC/PBAC Permission Database.pdf). Keeping the definitions
+    here lets the policy generator drop and recreate the tables, or build a fresh copy of a database
+    under another name, instead of relying on tables that were created by hand. Each definition has a
+    "{}" where the database name goes so that the same statement can create a live or a shadow table.
+"""
+
+from sqlalchemy import text
+from backend import isEmbedded, localStatements, qualify, embeddedIndexes, dropIndexStatement
+
+#table definitions for each access control database, in the order that they are created;
+#the condition column is named "con" since "condition" is a reserved word in MySQL and the
+#text columns are 191 characters long so that the covering indexes fit in InnoDB's 3072 byte limit;
+#policy_provenance maps the ids of the policies that were removed by compaction (see compact.py)
+#to the policy that replaced them, role_hierarchy and role_closure store the role hierarchy
+#and every pair of roles that it connects (see hierarchy.py), and purpose stores the purpose
+#trees as nested set intervals (see purpose.py)
+tableDict = {"rbac": {"user": "CREATE TABLE {}.user (u_name VARCHAR(191) NOT NULL, PRIMARY KEY (u_name));",
+                      "role": "CREATE TABLE {}.role (r_name VARCHAR(191) NOT NULL, PRIMARY KEY (r_name));",
+                      "assignment": "CREATE TABLE {}.assignment (u_name VARCHAR(191) NOT NULL, r_name VARCHAR(191) NOT NULL);",
+                      "role_hierarchy": "CREATE TABLE {}.role_hierarchy (senior VARCHAR(191) NOT NULL, junior VARCHAR(191) NOT NULL, PRIMARY KEY (senior, junior));",
+                      "role_closure": "CREATE TABLE {}.role_closure (senior VARCHAR(191) NOT NULL, junior VARCHAR(191) NOT NULL, depth INT NOT NULL, PRIMARY KEY (senior, junior));",
+                      "policy": "CREATE TABLE {}.policy (id INT NOT NULL, r_name VARCHAR(191), permission VARCHAR(191), con VARCHAR(191), PRIMARY KEY (id));",
+                      "policy_provenance": "CREATE TABLE {}.policy_provenance (id INT NOT NULL, source_id INT NOT NULL, PRIMARY KEY (source_id));"},
+             "abac": {"subject": "CREATE TABLE {}.subject (s_name VARCHAR(191) NOT NULL, PRIMARY KEY (s_name));",
+                      "s_attributes": "CREATE TABLE {}.s_attributes (s_attribute VARCHAR(191) NOT NULL, PRIMARY KEY (s_attribute));",
+                      "s_assignment": "CREATE TABLE {}.s_assignment (s_name VARCHAR(191) NOT NULL, s_attribute VARCHAR(191) NOT NULL);",
+                      "object": "CREATE TABLE {}.object (o_name VARCHAR(191) NOT NULL, PRIMARY KEY (o_name));",
+                      "o_attributes": "CREATE TABLE {}.o_attributes (o_attribute VARCHAR(191) NOT NULL, PRIMARY KEY (o_attribute));",
+                      "o_assignment": "CREATE TABLE {}.o_assignment (o_name VARCHAR(191) NOT NULL, o_attribute VARCHAR(191) NOT NULL);",
+                      "policy": "CREATE TABLE {}.policy (id INT NOT NULL, permission VARCHAR(191), s_attribute VARCHAR(191), o_attribute VARCHAR(191), e_attribute VARCHAR(191), PRIMARY KEY (id));",
+                      "policy_provenance": "CREATE TABLE {}.policy_provenance (id INT NOT NULL, source_id INT NOT NULL, PRIMARY KEY (source_id));"},
+             "pbac": {"policy": "CREATE TABLE {}.policy (id INT NOT NULL, purpose VARCHAR(191), permission VARCHAR(191), con VARCHAR(191), PRIMARY KEY (id));",
+                      "purpose": "CREATE TABLE {}.purpose (p_name VARCHAR(191) NOT NULL, parent VARCHAR(191), lft INT NOT NULL, rgt INT NOT NULL, depth INT NOT NULL, PRIMARY KEY (p_name));",
+                      "policy_provenance": "CREATE TABLE {}.policy_provenance (id INT NOT NULL, source_id INT NOT NULL, PRIMARY KEY (source_id));"}}
+
+#table definitions of the business database, from the TPC-H specification
+#(https://www.tpc.org/TPC_Documents_Current_Versions/pdf/TPC-H_v3.0.1.pdf), in the order that they are created
+businessTableDict = {"region": "CREATE TABLE {}.region (r_regionkey INT NOT NULL, r_name CHAR(25) NOT NULL, r_comment VARCHAR(152), PRIMARY KEY (r_regionkey));",
+                     "nation": "CREATE TABLE {}.nation (n_nationkey INT NOT NULL, n_name CHAR(25) NOT NULL, n_regionkey INT NOT NULL, n_comment VARCHAR(152), PRIMARY KEY (n_nationkey));",
+                     "part": "CREATE TABLE {}.part (p_partkey INT NOT NULL, p_name VARCHAR(55) NOT NULL, p_mfgr CHAR(25) NOT NULL, p_brand CHAR(10) NOT NULL, p_type VARCHAR(25) NOT NULL, p_size INT NOT NULL, p_container CHAR(10) NOT NULL, p_retailprice DECIMAL(15,2) NOT NULL, p_comment VARCHAR(23) NOT NULL, PRIMARY KEY (p_partkey));",
+                     "supplier": "CREATE TABLE {}.supplier (s_suppkey INT NOT NULL, s_name CHAR(25) NOT NULL, s_address VARCHAR(40) NOT NULL, s_nationkey INT NOT NULL, s_phone CHAR(15) NOT NULL, s_acctbal DECIMAL(15,2) NOT NULL, s_comment VARCHAR(101) NOT NULL, PRIMARY KEY (s_suppkey));",
+                     "partsupp": "CREATE TABLE {}.partsupp (ps_partkey INT NOT NULL, ps_suppkey INT NOT NULL, ps_availqty INT NOT NULL, ps_supplycost DECIMAL(15,2) NOT NULL, ps_comment VARCHAR(199) NOT NULL, PRIMARY KEY (ps_partkey, ps_suppkey));",
+                     "customer": "CREATE TABLE {}.customer (c_custkey INT NOT NULL, c_name VARCHAR(25) NOT NULL, c_address VARCHAR(40) NOT NULL, c_nationkey INT NOT NULL, c_phone CHAR(15) NOT NULL, c_acctbal DECIMAL(15,2) NOT NULL, c_mktsegment CHAR(10) NOT NULL, c_comment VARCHAR(117) NOT NULL, PRIMARY KEY (c_custkey));",
+                     "orders": "CREATE TABLE {}.orders (o_orderkey INT NOT NULL, o_custkey INT NOT NULL, o_orderstatus CHAR(1) NOT NULL, o_totalprice DECIMAL(15,2) NOT NULL, o_orderdate DATE NOT NULL, o_orderpriority CHAR(15) NOT NULL, o_clerk CHAR(15) NOT NULL, o_shippriority INT NOT NULL, o_comment VARCHAR(79) NOT NULL, PRIMARY KEY (o_orderkey));",
+                     "lineitem": "CREATE TABLE {}.lineitem (l_orderkey INT NOT NULL, l_partkey INT NOT NULL, l_suppkey INT NOT NULL, l_linenumber INT NOT NULL, l_quantity DECIMAL(15,2) NOT NULL, l_extendedprice DECIMAL(15,2) NOT NULL, l_discount DECIMAL(15,2) NOT NULL, l_tax DECIMAL(15,2) NOT NULL, l_returnflag CHAR(1) NOT NULL, l_linestatus CHAR(1) NOT NULL, l_shipdate DATE NOT NULL, l_commitdate DATE NOT NULL, l_receiptdate DATE NOT NULL, l_shipinstruct CHAR(25) NOT NULL, l_shipmode CHAR(10) NOT NULL, l_comment VARCHAR(44) NOT NULL, PRIMARY KEY (l_orderkey, l_linenumber));"}
+
+#secondary indexes of the business tables as (table, index name, columns), on the foreign keys that the
+#TPC-H queries join on; they are built after the tables are loaded (see bulk.py)
+businessIndexes = [("nation", "idx_n_regionkey", "n_regionkey"), ("supplier", "idx_s_nationkey", "s_nationkey"),
+                   ("customer", "idx_c_nationkey", "c_nationkey"), ("partsupp", "idx_ps_suppkey", "ps_suppkey"),
+                   ("orders", "idx_o_custkey", "o_custkey"), ("lineitem", "idx_l_partkey_suppkey", "l_partkey, l_suppkey")]
+
+#returns the table definitions of the given database
+def getTables(database):
+    if database == "business":
+        return businessTableDict
+    return tableDict[database]
+
+#returns the statements that drop and recreate every table of the given database,
+#as the backend runs them (see backend.py)
+def recreateStatements(database, name=None):
+    if name == None:
+        name = database
+    tables = getTables(database)
+    statements = ["CREATE DATABASE IF NOT EXISTS {};".format(name)]
+    for table in reversed(list(tables)):
+        statements.append("DROP TABLE IF EXISTS {}.{};".format(name, table))
+    for table in tables:
+        statements.append(tables[table].format(name))
+    return localStatements(statements)
+
+#returns the statements that create any table of the given database that does not exist yet
+def createStatements(database, name=None):
+    if name == None:
+        name = database
+    tables = getTables(database)
+    statements = ["CREATE DATABASE IF NOT EXISTS {};".format(name)]
+    for table in tables:
+        statements.append(tables[table].format(name).replace("CREATE TABLE", "CREATE TABLE IF NOT EXISTS", 1))
+    return localStatements(statements)
+
+""" returns a single RENAME TABLE statement that moves every table of the live database
+    into the old database and every table of the shadow database into the live database.
+    MySQL executes all the renames of one statement atomically, so queries against the
+    live database either see the complete old policy set or the complete new one.
+"""
+def swapStatement(database, shadow, old):
+    renames = []
+    for table in tableDict[database]:
+        renames.append("{0}.{2} TO {1}.{2}".format(database, old, table))
+        renames.append("{0}.{2} TO {1}.{2}".format(shadow, database, table))
+    return "RENAME TABLE " + ", ".join(renames) + ";"
+
+#secondary indexes of each index profile as (database, table, index name, columns);
+#"single" indexes each column that the permission lookups filter on and "covering" adds the
+#selected columns so that the lookups can be answered from the index alone
+indexProfiles = {"none": [],
+                 "single": [("rbac", "assignment", "idx_u_name", "u_name"), ("rbac", "policy", "idx_r_name", "r_name"), ("rbac", "policy", "idx_permission", "permission"),
+                            ("abac", "s_assignment", "idx_s_name", "s_name"), ("abac", "o_assignment", "idx_o_name", "o_name"), ("abac", "policy", "idx_permission", "permission"),
+                            ("pbac", "policy", "idx_purpose", "purpose"), ("pbac", "policy", "idx_permission", "permission"), ("pbac", "purpose", "idx_lft_rgt", "lft, rgt")],
+                 "covering": [("rbac", "assignment", "idx_u_name_r_name", "u_name, r_name"), ("rbac", "policy", "idx_r_name_permission_con", "r_name, permission, con"),
+                              ("abac", "s_assignment", "idx_s_name_s_attribute", "s_name, s_attribute"), ("abac", "o_assignment", "idx_o_name_o_attribute", "o_name, o_attribute"),
+                              ("abac", "policy", "idx_permission_attributes", "permission, s_attribute, o_attribute, e_attribute"),
+                              ("pbac", "policy", "idx_purpose_permission_con", "purpose, permission, con"), ("pbac", "purpose", "idx_lft_rgt_p_name", "lft, rgt, p_name")]}
+
+#returns the secondary indexes that currently exist in the given database
+#as a dictionary of (table, index name) to a string of its columns
+def getIndexes(conn, database):
+    indexes = {}
+    if isEmbedded():
+        rows = embeddedIndexes(conn)
+    else:
+        result = conn.execute(text("SELECT TABLE_NAME, INDEX_NAME, COLUMN_NAME FROM information_schema.STATISTICS WHERE TABLE_SCHEMA = '{}' AND INDEX_NAME != 'PRIMARY' ORDER BY TABLE_NAME, INDEX_NAME, SEQ_IN_INDEX;".format(database)))
+        rows = [(row.TABLE_NAME, row.INDEX_NAME, row.COLUMN_NAME) for row in result]
+    for table, index, column in rows:
+        key = (table, index)
+        if key in indexes:
+            indexes[key] = indexes[key] + ", " + column
+        else:
+            indexes[key] = column
+    return indexes
+
+#replaces the secondary indexes of the given database with the ones in the index profile
+def applyProfile(conn, database, profile):
+    for table, index in getIndexes(conn, database):
+        conn.execute(text(dropIndexStatement(database, table, index)))
+    for entry in indexProfiles[profile]:
+        if entry[0] == database:
+            conn.execute(text("CREATE INDEX {} ON {} ({});".format(entry[2], qualify(database, entry[1]), entry[3])))
+    conn.commit()
+
+#compares the secondary indexes of the given database with the index profile;
+#returns a list of the differences, which is empty if the database matches the profile
+def verifyProfile(conn, database, profile):
+    problems = []
+    indexes = getIndexes(conn, database)
+    expected = {}
+    for entry in indexProfiles[profile]:
+        if entry[0] == database:
+            expected[(entry[1], entry[2])] = entry[3]
+    for key in expected:
+        if key not in indexes:
+            problems.append("missing index {} on {}.{}".format(key[1], database, key[0]))
+        elif indexes[key] != expected[key]:
+            problems.append("index {} on {}.{} has columns ({}) instead of ({})".format(key[1], database, key[0], indexes[key], expected[key]))
+    for key in indexes:
+        if key not in expected:
+            problems.append("unexpected index {} on {}.{}".format(key[1], database, key[0]))
+    return problems
@@ -0,0 +1,249 @@
+""" Description: This file stores the policies of the abac, rbac, and pbac permission databases in a compact
+    columnar form that a decision engine inside the driver can use without asking the database, and
+    writes it to a versioned binary snapshot file. Every distinct string (permission, condition, role,
+    purpose, attribute, or name) is stored once in a sorted string table, the policy columns are arrays of
+    string ids, and the policies are sorted by permission with CSR-style offsets, so the policies of a
+    permission are a slice of each column. The assignments (user to role, subject to attribute, and
+    object to attribute) are stored the same way. A snapshot file is opened with mmap and the columns are
+    memoryviews of the mapped file, so opening it takes the same few milliseconds no matter how many
+    policies it has, nothing is copied, and the pages are shared by every process that opens the file.
+    The columns use the standard library's array module instead of NumPy so that the snapshot has no
+    extra dependencies.
+"""
+
+import array
+import json
+import mmap
+import struct
+from sqlalchemy import text
+
+#the first bytes of every snapshot file and the version of the layout
+snapshotMagic = b"ACSNAP\0\0"
+snapshotVersion = 1
+headerFormat = "<8sII"
+
+#the policy columns and assignment tables of each access control database;
+#the columns are stored in this order and the first column of an assignment is the name;
+#the rbac assignment stores every role that a user has directly or through the role hierarchy
+#and the pbac purpose "assignment" stores every purpose that a purpose is under, including itself
+policyColumns = {"rbac": ["r_name", "permission", "con"],
+                 "abac": ["permission", "s_attribute", "o_attribute", "e_attribute"],
+                 "pbac": ["purpose", "permission", "con"]}
+assignmentTables = {"rbac": {"assignment": ["u_name", "r_name"]},
+                    "abac": {"s_assignment": ["s_name", "s_attribute"], "o_assignment": ["o_name", "o_attribute"]},
+                    "pbac": {"purpose": ["p_name", "ancestor"]}}
+assignmentQueries = {"assignment": "SELECT DISTINCT a.u_name, c.junior AS r_name FROM assignment a JOIN role_closure c ON c.senior = a.r_name;",
+                     "purpose": "SELECT u.p_name, q.p_name AS ancestor FROM purpose u JOIN purpose q ON q.lft <= u.lft AND u.rgt <= q.rgt;"}
+
+#returns an array of 4 byte integers
+def intArray(values=()):
+    return array.array("i", values)
+
+#returns the start of each row's group and the rows sorted by the given key column,
+#as CSR offsets with one entry per string id and one more for the end
+def groupRows(keys, count):
+    order = sorted(range(len(keys)), key=lambda r: keys[r])
+    offsets = intArray([0] * (count + 1))
+    for key in keys:
+        offsets[key + 1] += 1
+    for i in range(count):
+        offsets[i + 1] += offsets[i]
+    return order, offsets
+
+""" the columnar policies of one database. The columns are either arrays (when the
+    snapshot is built from the database) or memoryviews of a mapped snapshot file, and
+    are only read through the methods below, so both work the same way. NULL values are
+    stored as the string id -1.
+"""
+class PolicySnapshot:
+    def __init__(self, database, strings, offsets, columns, permissionOffsets, assignments):
+        self.database = database
+        self.strings = strings
+        self.stringOffsets = offsets
+        self.columns = columns
+        self.permissionOffsets = permissionOffsets
+        self.assignments = assignments
+        self.file = None
+
+    #returns the number of policies
+    def count(self):
+        return len(self.columns["permission"])
+
+    #returns the string of a string id, or None for -1
+    def getString(self, id):
+        if id < 0:
+            return None
+        return bytes(self.strings[self.stringOffsets[id]:self.stringOffsets[id + 1]]).decode("utf-8")
+
+    #returns the string id of a string by binary search of the sorted string table,
+    #or -1 if the string is not stored
+    def getID(self, value):
+        key = value.encode("utf-8")
+        low = 0
+        high = len(self.stringOffsets) - 1
+        while low < high:
+            middle = (low + high) // 2
+            current = bytes(self.strings[self.stringOffsets[middle]:self.stringOffsets[middle + 1]])
+            if current < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low < len(self.stringOffsets) - 1 and bytes(self.strings[self.stringOffsets[low]:self.stringOffsets[low + 1]]) == key:
+            return low
+        return -1
+
+    #returns the policies of a permission as a list of tuples of the other columns' strings
+    def getPolicies(self, permission):
+        id = self.getID(permission)
+        if id < 0:
+            return []
+        names = [column for column in policyColumns[self.database] if column != "permission"]
+        policies = []
+        for row in range(self.permissionOffsets[id], self.permissionOffsets[id + 1]):
+            policies.append(tuple([self.getString(self.columns[column][row]) for column in names]))
+        return policies
+
+    #returns the values assigned to a name in one of the assignment tables
+    def getAssigned(self, table, name):
+        id = self.getID(name)
+        if id < 0:
+            return []
+        offsets, values = self.assignments[table]
+        return [self.getString(values[row]) for row in range(offsets[id], offsets[id + 1])]
+
+    #unmaps the snapshot file if the snapshot was opened from one
+    def close(self):
+        if self.file != None:
+            self.columns = None
+            self.assignments = None
+            self.strings = None
+            self.stringOffsets = None
+            self.permissionOffsets = None
+            self.file.close()
+            self.file = None
+
+""" reads the policies and assignments of the database that the connection uses and
+    returns them as a PolicySnapshot with array columns. The strings are interned while
+    the rows are read and then sorted, so that the string ids can be found by binary
+    search in the snapshot file without building a dictionary when it is opened.
+"""
+def buildSnapshot(conn, database):
+    interned = {}
+    columns = policyColumns[database]
+    result = conn.execute(text("SELECT {} FROM policy;".format(", ".join(columns))))
+    rows = [tuple(row) for row in result]
+    pairs = {}
+    for table in assignmentTables[database]:
+        if table in assignmentQueries:
+            result = conn.execute(text(assignmentQueries[table]))
+        else:
+            result = conn.execute(text("SELECT {} FROM {};".format(", ".join(assignmentTables[database][table]), table)))
+        pairs[table] = [tuple(row) for row in result]
+    for row in rows:
+        for value in row:
+            if value != None:
+                interned[value] = 0
+    for table in pairs:
+        for pair in pairs[table]:
+            for value in pair:
+                if value != None:
+                    interned[value] = 0
+
+    #sorts the strings by their bytes so that the ids are in the order the binary search expects
+    encoded = sorted([value.encode("utf-8") for value in interned])
+    strings = bytearray()
+    offsets = intArray([0])
+    for i in range(len(encoded)):
+        interned[encoded[i].decode("utf-8")] = i
+        strings.extend(encoded[i])
+        offsets.append(len(strings))
+    count = len(encoded)
+
+    def getID(value):
+        return -1 if value == None else interned[value]
+
+    permissionIndex = columns.index("permission")
+    keys = [getID(row[permissionIndex]) for row in rows]
+    keys = [key if key >= 0 else count for key in keys]
+    order, permissionOffsets = groupRows(keys, count + 1)
+    policyArrays = {}
+    for c in range(len(columns)):
+        policyArrays[columns[c]] = intArray([getID(rows[r][c]) for r in order])
+
+    assignments = {}
+    for table in pairs:
+        keys = [getID(pair[0]) for pair in pairs[table]]
+        keys = [key if key >= 0 else count for key in keys]
+        order, assignmentOffsets = groupRows(keys, count + 1)
+        assignments[table] = (assignmentOffsets, intArray([getID(pairs[table][r][1]) for r in order]))
+    return PolicySnapshot(database, strings, offsets, policyArrays, permissionOffsets, assignments)
+
+""" writes a snapshot to a binary file: a header with the magic bytes, the layout version,
+    and the length of a json directory, then the directory, which gives the database and
+    the byte offset and length of each section, and then the sections, each aligned to
+    8 bytes so that the integer sections can be mapped as memoryviews of 4 byte integers
+"""
+def writeSnapshot(snapshot, filename):
+    sections = [("strings", bytes(snapshot.strings)), ("string_offsets", snapshot.stringOffsets.tobytes()), ("permission_offsets", snapshot.permissionOffsets.tobytes())]
+    for column in policyColumns[snapshot.database]:
+        sections.append(("policy." + column, snapshot.columns[column].tobytes()))
+    for table in assignmentTables[snapshot.database]:
+        offsets, values = snapshot.assignments[table]
+        sections.append(("assignment." + table + ".offsets", offsets.tobytes()))
+        sections.append(("assignment." + table + ".values", values.tobytes()))
+
+    #the offsets depend on the length of the directory, so they are placed again
+    #until the directory stops changing length
+    directory = {"database": snapshot.database, "policies": snapshot.count(), "sections": {}}
+    for name, data in sections:
+        directory["sections"][name] = [0, len(data)]
+    header = b""
+    while len(json.dumps(directory, sort_keys=True).encode("utf-8")) != len(header):
+        header = json.dumps(directory, sort_keys=True).encode("utf-8")
+        position = struct.calcsize(headerFormat) + len(header)
+        for name, data in sections:
+            position += (-position) % 8
+            directory["sections"][name] = [position, len(data)]
+            position += len(data)
+    header = json.dumps(directory, sort_keys=True).encode("utf-8")
+
+    f = open(filename, "wb")
+    f.write(struct.pack(headerFormat, snapshotMagic, snapshotVersion, len(header)))
+    f.write(header)
+    for name, data in sections:
+        f.write(b"\0" * (directory["sections"][name][0] - f.tell()))
+        f.write(data)
+    f.close()
+
+#opens a snapshot file with mmap and returns a PolicySnapshot whose columns are views of the file;
+#raises a ValueError if the file is not a snapshot or has another layout version
+def openSnapshot(filename):
+    f = open(filename, "rb")
+    mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    f.close()
+    size = struct.calcsize(headerFormat)
+    magic, version, length = struct.unpack(headerFormat, mapped[:size])
+    if magic != snapshotMagic:
+        mapped.close()
+        raise ValueError("{} is not a policy snapshot".format(filename))
+    if version != snapshotVersion:
+        mapped.close()
+        raise ValueError("{} has snapshot version {} instead of {}".format(filename, version, snapshotVersion))
+    directory = json.loads(mapped[size:size + length].decode("utf-8"))
+    view = memoryview(mapped)
+
+    def section(name, integers=True):
+        start, length = directory["sections"][name]
+        part = view[start:start + length]
+        return part.cast("i") if integers else part
+
+    database = directory["database"]
+    columns = {}
+    for column in policyColumns[database]:
+        columns[column] = section("policy." + column)
+    assignments = {}
+    for table in assignmentTables[database]:
+        assignments[table] = (section("assignment." + table + ".offsets"), section("assignment." + table + ".values"))
+    snapshot = PolicySnapshot(database, section("strings", False), section("string_offsets"), columns, section("permission_offsets"), assignments)
+    snapshot.file = mapped
+    return snapshot
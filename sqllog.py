@@ -0,0 +1,53 @@
+""" Description: This file keeps the log of the SQL statements that the programs execute off the timed parts of a
+    run. The engines used to be created with echo=True, which prints every statement and its parameters to the
+    terminal as it is executed, so the time of every permission lookup and view included the time to print
+    it. Instead, the statements are only logged if the AC_SQL_LOG environment variable is set ("stdout" or the
+    name of a file). The records are then put on a queue when they are made and written out by flushLog, which
+    the driver calls after each query's times have been measured and which also runs when the program exits,
+    so the terminal or file is never written to while a query or a permission check is being timed.
+"""
+
+import atexit
+import logging
+import queue
+import os
+import sys
+from logging.handlers import QueueHandler
+
+#where the statements are written: "" (not logged), "stdout", or a file name
+logDestination = os.environ.get("AC_SQL_LOG", "")
+
+#the records that have not been written yet and the format they are written in
+records = queue.SimpleQueue()
+logFormat = logging.Formatter("%(asctime)s %(levelname)s %(name)s %(message)s")
+logStarted = False
+
+#sends the statements of every engine to the queue if the log is on; this has to be called before
+#the engines are created, since each connection checks the log level when it is opened
+def startLog():
+    global logStarted
+    if logDestination == "" or logStarted:
+        return
+    logger = logging.getLogger("sqlalchemy.engine.Engine")
+    logger.setLevel(logging.INFO)
+    logger.addHandler(QueueHandler(records))
+    logger.propagate = False
+    atexit.register(flushLog)
+    logStarted = True
+
+#writes out the records on the queue
+def flushLog():
+    if not logStarted:
+        return
+    lines = []
+    while not records.empty():
+        lines.append(logFormat.format(records.get()) + "\n")
+    if not lines:
+        return
+    if logDestination == "stdout":
+        sys.stdout.writelines(lines)
+        sys.stdout.flush()
+    else:
+        f = open(logDestination, "a")
+        f.writelines(lines)
+        f.close()
@@ -0,0 +1,375 @@
+""" Description: This file generates the eight TPC-H tables of the business database at any scale factor, so the
+    benchmark does not need the dbgen program or hand-loaded .tbl files. The rows follow the value ranges and
+    formats of the TPC-H specification (https://www.tpc.org/TPC_Documents_Current_Versions/pdf/TPC-H_v3.0.1.pdf):
+    the sparse order keys, the part and supplier keys of partsupp and lineitem, the retail price formula, the
+    order and ship dates, the return flags and line statuses that depend on them, the order status and total
+    price that are computed from the order's line items, and comments cut out of a text pool of the
+    specification's words, so the 22 queries select rows at about the rates that they do on dbgen data. The
+    rows are not the same as dbgen's. Every column is drawn with NumPy for a whole chunk of rows at a time,
+    and each chunk has its own random generator seeded with the seed, the table, and the chunk number, so the
+    same seed and chunk size always give the same data no matter how many tables are generated in parallel.
+    The chunks are written as .tbl lines and loaded into the database as they are generated (see backend.py),
+    so a large scale factor never has to fit in memory or on disk, and the keys and indexes are built
+    after the load (see bulk.py).
+"""
+
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from backend import isEmbedded, getEngine, loadLines
+from bulk import createTables, buildIndexes, beginLoad, endLoad
+
+#the tables that are generated together; partsupp is generated with part and lineitem with orders,
+#since the order status and total price depend on the order's line items
+tableJobs = {"region": ["region"], "nation": ["nation"], "supplier": ["supplier"], "customer": ["customer"],
+             "part": ["part", "partsupp"], "orders": ["orders", "lineitem"]}
+
+#the number of rows of each job's first table at scale factor 1
+baseRows = {"region": 5, "nation": 25, "supplier": 10000, "customer": 150000, "part": 200000, "orders": 1500000}
+
+regions = ["AFRICA", "AMERICA", "ASIA", "EUROPE", "MIDDLE EAST"]
+nations = [("ALGERIA", 0), ("ARGENTINA", 1), ("BRAZIL", 1), ("CANADA", 1), ("EGYPT", 4), ("ETHIOPIA", 0), ("FRANCE", 3), ("GERMANY", 3),
+           ("INDIA", 2), ("INDONESIA", 2), ("IRAN", 4), ("IRAQ", 4), ("JAPAN", 2), ("JORDAN", 4), ("KENYA", 0), ("MOROCCO", 0),
+           ("MOZAMBIQUE", 0), ("PERU", 1), ("CHINA", 2), ("ROMANIA", 3), ("SAUDI ARABIA", 4), ("VIETNAM", 2), ("RUSSIA", 3),
+           ("UNITED KINGDOM", 3), ("UNITED STATES", 1)]
+colors = ["almond", "antique", "aquamarine", "azure", "beige", "bisque", "black", "blanched", "blue", "blush", "brown", "burlywood",
+          "burnished", "chartreuse", "chiffon", "chocolate", "coral", "cornflower", "cornsilk", "cream", "cyan", "dark", "deep", "dim",
+          "dodger", "drab", "firebrick", "floral", "forest", "frosted", "gainsboro", "ghost", "goldenrod", "green", "grey", "honeydew",
+          "hot", "indian", "ivory", "khaki", "lace", "lavender", "lawn", "lemon", "light", "lime", "linen", "magenta", "maroon", "medium",
+          "metallic", "midnight", "mint", "misty", "moccasin", "navajo", "navy", "olive", "orange", "orchid", "pale", "papaya", "peach",
+          "peru", "pink", "plum", "powder", "puff", "purple", "red", "rose", "rosy", "royal", "saddle", "salmon", "sandy", "seashell",
+          "sienna", "sky", "slate", "smoke", "snow", "spring", "steel", "tan", "thistle", "tomato", "turquoise", "violet", "wheat",
+          "white", "yellow"]
+typeSyllables = [["STANDARD", "SMALL", "MEDIUM", "LARGE", "ECONOMY", "PROMO"], ["ANODIZED", "BURNISHED", "PLATED", "POLISHED", "BRUSHED"],
+                 ["TIN", "NICKEL", "BRASS", "STEEL", "COPPER"]]
+containerSyllables = [["SM", "LG", "MED", "JUMBO", "WRAP"], ["CASE", "BOX", "BAG", "JAR", "PKG", "PACK", "CAN", "DRUM"]]
+segments = ["AUTOMOBILE", "BUILDING", "FURNITURE", "MACHINERY", "HOUSEHOLD"]
+priorities = ["1-URGENT", "2-HIGH", "3-MEDIUM", "4-NOT SPECIFIED", "5-LOW"]
+instructions = ["DELIVER IN PERSON", "COLLECT COD", "NONE", "TAKE BACK RETURN"]
+modes = ["REG AIR", "AIR", "RAIL", "SHIP", "TRUCK", "MAIL", "FOB"]
+
+#the words of the text pool that the comments are cut from
+nouns = ["foxes", "ideas", "theodolites", "pinto beans", "instructions", "dependencies", "excuses", "platelets", "asymptotes", "courts",
+         "dolphins", "multipliers", "sauternes", "warthogs", "frets", "dinos", "attainments", "somas", "Tiresias", "patterns", "forges",
+         "braids", "hockey players", "frays", "warhorses", "dugouts", "notornis", "epitaphs", "pearls", "tithes", "waters", "orbits",
+         "gifts", "sheaves", "depths", "sentiments", "decoys", "realms", "pains", "grouches", "escapades", "packages", "requests",
+         "accounts", "deposits"]
+verbs = ["sleep", "wake", "are", "cajole", "haggle", "nag", "use", "boost", "affix", "detect", "integrate", "maintain", "nod", "was",
+         "lose", "sublate", "solve", "thrash", "promise", "engage", "hinder", "print", "x-ray", "breach", "eat", "grow", "impress",
+         "mold", "poach", "serve", "run", "dazzle", "snooze", "doze", "unwind", "kindle", "play", "hang", "believe", "doubt"]
+adjectives = ["furious", "sly", "careful", "blithe", "quick", "fluffy", "slow", "quiet", "ruthless", "thin", "close", "dogged", "daring",
+              "brave", "stealthy", "permanent", "enticing", "idle", "busy", "regular", "final", "ironic", "even", "bold", "silent",
+              "special", "pending", "unusual", "express"]
+adverbs = ["sometimes", "always", "never", "furiously", "slyly", "carefully", "blithely", "quickly", "fluffily", "slowly", "quietly",
+           "ruthlessly", "thinly", "closely", "doggedly", "daringly", "bravely", "stealthily", "permanently", "enticingly", "idly",
+           "busily", "regularly", "finally", "ironically", "evenly", "boldly", "silently"]
+prepositions = ["about", "above", "according to", "across", "after", "against", "along", "among", "around", "at", "atop", "before",
+                "behind", "beneath", "beside", "besides", "between", "beyond", "by", "despite", "during", "except", "for", "from",
+                "inside", "into", "near", "of", "on", "outside", "over", "past", "since", "through", "to", "toward", "under", "until",
+                "upon", "without", "with", "within"]
+terminators = [".", ";", ":", "?", "!", "--"]
+
+#the dates of the specification: the first order date, the last order date (151 days before the
+#end date, so that every line item ships before it ends), and the current date of the return flags
+startDate = np.datetime64("1992-01-01")
+lastOrderDate = np.datetime64("1998-08-02")
+currentDate = np.datetime64("1995-06-17")
+
+#the characters of the random addresses
+addressCharacters = np.array(list("0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ,"))
+
+#the text pool of each seed, which is generated once per process
+textPools = {}
+
+#returns True if the 4 suppliers that partSupplier gives every part are different; the specification's
+#formula repeats a supplier for some of the small supplier counts of scale factors below about 0.03
+def distinctSuppliers(suppliers, parts):
+    steps = suppliers // 4 + np.arange((parts - 1) // suppliers + 1)
+    for i in range(1, 4):
+        if np.any(i * steps % suppliers == 0):
+            return False
+    return True
+
+#returns the number of rows of each job's first table at a scale factor; suppliers are at least 4,
+#and are added until every part has 4 different suppliers, so partsupp has no duplicate keys
+def getRowCounts(scale):
+    counts = {}
+    for job in baseRows:
+        counts[job] = baseRows[job] if job in ("region", "nation") else max(1, int(baseRows[job] * scale))
+    counts["supplier"] = max(4, counts["supplier"])
+    while not distinctSuppliers(counts["supplier"], counts["part"]):
+        counts["supplier"] += 1
+    return counts
+
+#returns the text pool of a seed: about a megabyte of sentences of the form
+#"adjective noun verb adverb preposition the adjective noun terminator"
+def getTextPool(seed):
+    if seed not in textPools:
+        rng = np.random.default_rng([seed, 0])
+        sentences = 20000
+        parts = [adjectives, nouns, verbs, adverbs, prepositions, adjectives, nouns]
+        picks = [rng.integers(0, len(words), sentences) for words in parts]
+        ends = rng.integers(0, len(terminators), sentences)
+        pool = []
+        for s in range(sentences):
+            pool.append("{} {} {} {} {} the {} {}{} ".format(*[parts[w][picks[w][s]] for w in range(len(parts))], terminators[ends[s]]))
+        textPools[seed] = "".join(pool)
+    return textPools[seed]
+
+#returns n comments between low and high characters long, cut out of the text pool at random offsets
+def comments(rng, pool, n, low, high):
+    lengths = rng.integers(low, high + 1, n)
+    offsets = rng.integers(0, len(pool) - high, n)
+    return [pool[o:o + l] for o, l in zip(offsets.tolist(), lengths.tolist())]
+
+#returns n random strings of letters, digits, and commas between low and high characters long
+def addresses(rng, n, low, high):
+    lengths = rng.integers(low, high + 1, n)
+    characters = "".join(addressCharacters[rng.integers(0, len(addressCharacters), int(lengths.sum()))].tolist())
+    ends = np.cumsum(lengths).tolist()
+    return [characters[end - length:end] for end, length in zip(ends, lengths.tolist())]
+
+#returns the phone numbers of n rows in the given nations; the country code is the nation key plus 10
+def phones(rng, nationKeys):
+    n = len(nationKeys)
+    numbers = zip((nationKeys + 10).tolist(), rng.integers(100, 1000, n).tolist(), rng.integers(100, 1000, n).tolist(), rng.integers(1000, 10000, n).tolist())
+    return ["{}-{}-{}-{}".format(*number) for number in numbers]
+
+#returns money in cents as strings with two decimals
+def money(cents):
+    return ["%.2f" % value for value in (cents / 100).tolist()]
+
+#returns the strings of the given indexes of a list of values
+def pick(values, indexes):
+    return np.array(values, dtype=object)[indexes].tolist()
+
+#returns dates as "yyyy-mm-dd" strings
+def dates(values):
+    return np.datetime_as_string(values, unit="D").tolist()
+
+#returns the retail price in cents of each part key
+def retailPrice(partKeys):
+    return 90000 + (partKeys // 10) % 20001 + 100 * (partKeys % 1000)
+
+#returns the supplier key of the i-th (0 to 3) supplier of each part key
+def partSupplier(partKeys, i, suppliers):
+    return (partKeys + i * (suppliers // 4 + (partKeys - 1) // suppliers)) % suppliers + 1
+
+#returns the .tbl lines of the given columns, each ending in "|" like dbgen's
+def tableLines(columns):
+    line = "|".join(["{}"] * len(columns)) + "|\n"
+    return [line.format(*row) for row in zip(*columns)]
+
+#returns the rows of the region and nation tables, which are the same at every scale factor
+def generateRegion(rng, pool, start, count, counts):
+    names = regions[start:start + count]
+    return {"region": tableLines([list(range(start, start + len(names))), names, comments(rng, pool, len(names), 31, 115)])}
+
+def generateNation(rng, pool, start, count, counts):
+    rows = nations[start:start + count]
+    return {"nation": tableLines([list(range(start, start + len(rows))), [row[0] for row in rows], [row[1] for row in rows], comments(rng, pool, len(rows), 31, 114)])}
+
+#returns count suppliers starting at the given row; about 5 in 10000 have "Customer ... Complaints"
+#in their comment and as many have "Customer ... Recommends" (query 16 leaves out the complaints)
+def generateSupplier(rng, pool, start, count, counts):
+    keys = np.arange(start + 1, start + count + 1)
+    nationKeys = rng.integers(0, 25, count)
+    notes = comments(rng, pool, count, 25, 100)
+    special = rng.random(count)
+    for r in np.nonzero(special < 0.001)[0].tolist():
+        notes[r] = ("Customer Complaints " if special[r] < 0.0005 else "Customer Recommends ") + notes[r][:80]
+    return {"supplier": tableLines([keys.tolist(), ["Supplier#%09d" % key for key in keys.tolist()], addresses(rng, count, 10, 40), nationKeys.tolist(),
+                                    phones(rng, nationKeys), money(rng.integers(-99999, 1000000, count)), notes])}
+
+def generateCustomer(rng, pool, start, count, counts):
+    keys = np.arange(start + 1, start + count + 1)
+    nationKeys = rng.integers(0, 25, count)
+    return {"customer": tableLines([keys.tolist(), ["Customer#%09d" % key for key in keys.tolist()], addresses(rng, count, 10, 40), nationKeys.tolist(),
+                                    phones(rng, nationKeys), money(rng.integers(-99999, 1000000, count)), pick(segments, rng.integers(0, len(segments), count)),
+                                    comments(rng, pool, count, 29, 116)])}
+
+#returns count parts starting at the given row and the 4 partsupp rows of each part
+def generatePart(rng, pool, start, count, counts):
+    keys = np.arange(start + 1, start + count + 1)
+    words = np.argsort(rng.random((count, len(colors))), axis=1)[:, :5]
+    names = [" ".join(row) for row in np.array(colors, dtype=object)[words].tolist()]
+    manufacturers = rng.integers(1, 6, count)
+    brands = manufacturers * 10 + rng.integers(1, 6, count)
+    types = [" ".join(row) for row in zip(*[pick(syllables, rng.integers(0, len(syllables), count)) for syllables in typeSyllables])]
+    containers = [" ".join(row) for row in zip(*[pick(syllables, rng.integers(0, len(syllables), count)) for syllables in containerSyllables])]
+    part = tableLines([keys.tolist(), names, ["Manufacturer#{}".format(m) for m in manufacturers.tolist()], ["Brand#{}".format(b) for b in brands.tolist()],
+                       types, rng.integers(1, 51, count).tolist(), containers, money(retailPrice(keys)), comments(rng, pool, count, 5, 22)])
+    partKeys = np.repeat(keys, 4)
+    supplierKeys = partSupplier(partKeys, np.tile(np.arange(4), count), counts["supplier"])
+    partsupp = tableLines([partKeys.tolist(), supplierKeys.tolist(), rng.integers(1, 10000, 4 * count).tolist(), money(rng.integers(100, 100001, 4 * count)),
+                           comments(rng, pool, 4 * count, 49, 198)])
+    return {"part": part, "partsupp": partsupp}
+
+""" returns count orders starting at the given row and their 1 to 7 line items. The order keys
+    are sparse (the first 8 of every 32), only customers whose key is not a multiple of 3 have
+    orders, and the status and total price of each order are computed from its line items.
+"""
+def generateOrders(rng, pool, start, count, counts):
+    rows = np.arange(start, start + count)
+    keys = (rows // 8) * 32 + rows % 8 + 1
+    customers = counts["customer"]
+    customerRows = rng.integers(0, max(1, customers - customers // 3), count)
+    customerKeys = np.minimum(customerRows + customerRows // 2 + 1, customers)
+    orderDates = startDate + rng.integers(0, int((lastOrderDate - startDate) / np.timedelta64(1, "D")) + 1, count)
+
+    lines = rng.integers(1, 8, count)
+    total = int(lines.sum())
+    order = np.repeat(np.arange(count), lines)
+    lineNumbers = np.arange(total) - np.repeat(np.cumsum(lines) - lines, lines) + 1
+    partKeys = rng.integers(1, counts["part"] + 1, total)
+    supplierKeys = partSupplier(partKeys, rng.integers(0, 4, total), counts["supplier"])
+    quantities = rng.integers(1, 51, total)
+    prices = quantities * retailPrice(partKeys)
+    discounts = rng.integers(0, 11, total)
+    taxes = rng.integers(0, 9, total)
+    shipDates = orderDates[order] + rng.integers(1, 122, total)
+    commitDates = orderDates[order] + rng.integers(30, 91, total)
+    receiptDates = shipDates + rng.integers(1, 31, total)
+    returnFlags = np.where(receiptDates <= currentDate, np.where(rng.random(total) < 0.5, "R", "A"), "N")
+    lineStatuses = np.where(shipDates > currentDate, "O", "F")
+    lineitem = tableLines([keys[order].tolist(), partKeys.tolist(), supplierKeys.tolist(), lineNumbers.tolist(), quantities.tolist(), money(prices),
+                           ["%.2f" % (d / 100) for d in discounts.tolist()], ["%.2f" % (t / 100) for t in taxes.tolist()], returnFlags.tolist(),
+                           lineStatuses.tolist(), dates(shipDates), dates(commitDates), dates(receiptDates), pick(instructions, rng.integers(0, len(instructions), total)),
+                           pick(modes, rng.integers(0, len(modes), total)), comments(rng, pool, total, 10, 43)])
+
+    finished = np.bincount(order, weights=(lineStatuses == "F"), minlength=count)
+    statuses = np.where(finished == lines, "F", np.where(finished == 0, "O", "P"))
+    totals = np.round(np.bincount(order, weights=prices * (100 + taxes) * (100 - discounts) / 10000, minlength=count))
+    clerks = rng.integers(1, max(1, int(1000 * counts["orders"] / baseRows["orders"])) + 1, count)
+    orders = tableLines([keys.tolist(), customerKeys.tolist(), statuses.tolist(), money(totals), dates(orderDates), pick(priorities, rng.integers(0, len(priorities), count)),
+                         ["Clerk#%09d" % clerk for clerk in clerks.tolist()], [0] * count, comments(rng, pool, count, 19, 78)])
+    return {"orders": orders, "lineitem": lineitem}
+
+generators = {"region": generateRegion, "nation": generateNation, "supplier": generateSupplier, "customer": generateCustomer,
+              "part": generatePart, "orders": generateOrders}
+
+#yields the .tbl lines of the chunks of a job from the first chunk up to (not including) the last one
+#as a dictionary of table to lines; each chunk has chunkRows rows of the job's first table and its
+#own random generator, so a job can be split into ranges of chunks that are generated separately
+def generateChunks(job, scale, seed, chunkRows=50000, first=0, last=None):
+    counts = getRowCounts(scale)
+    pool = getTextPool(seed)
+    number = list(tableJobs).index(job) + 1
+    if last == None:
+        last = chunkCount(job, scale, chunkRows)
+    for chunk in range(first, last):
+        rng = np.random.default_rng([seed, number, chunk])
+        start = chunk * chunkRows
+        yield generators[job](rng, pool, start, min(chunkRows, counts[job] - start), counts)
+
+#returns the number of chunks of a job
+def chunkCount(job, scale, chunkRows):
+    return -(-getRowCounts(scale)[job] // chunkRows)
+
+#returns the parts of the work as (job, first chunk, last chunk); each job is split into up to
+#workers ranges of chunks so that the large tables are spread over all the workers
+def getParts(scale, chunkRows, workers):
+    parts = []
+    for job in tableJobs:
+        chunks = chunkCount(job, scale, chunkRows)
+        pieces = max(1, min(workers, chunks))
+        for piece in range(pieces):
+            parts.append((job, chunks * piece // pieces, chunks * (piece + 1) // pieces))
+    return parts
+
+#generates a part of a job and loads each chunk into the database over its own connection as
+#it is generated; returns the number of rows of each table
+def loadPart(part, database, scale, seed, chunkRows):
+    job, first, last = part
+    rows = {}
+    engine = getEngine(database)
+    with engine.connect() as conn:
+        beginLoad(conn)
+        for chunk in generateChunks(job, scale, seed, chunkRows, first, last):
+            for table in chunk:
+                loadLines(conn, chunk[table], table, "|")
+                rows[table] = rows.get(table, 0) + len(chunk[table])
+            conn.commit()
+        endLoad(conn)
+    return rows
+
+#generates a part of a job into a numbered .tbl file of each table; returns the number of rows of each table
+def writePart(part, directory, scale, seed, chunkRows):
+    job, first, last = part
+    rows = {}
+    files = {}
+    for table in tableJobs[job]:
+        files[table] = open(os.path.join(directory, "{}.tbl.{}".format(table, first)), "w")
+        rows[table] = 0
+    for chunk in generateChunks(job, scale, seed, chunkRows, first, last):
+        for table in chunk:
+            files[table].writelines(chunk[table])
+            rows[table] += len(chunk[table])
+    for table in files:
+        files[table].close()
+    return rows
+
+#returns the pool that runs the parts in parallel, or None if the parts run one after another because
+#the embedded database allows only one writer; the workers are forked where fork is available, so that
+#they start with NumPy and SQLAlchemy already imported, and spawned otherwise, which only imports this
+#file (importing policies.py or driver.py does not ask for input, see their main functions)
+def getPool(workers, embedded):
+    if workers <= 1 or embedded:
+        return None
+    if "fork" in multiprocessing.get_all_start_methods():
+        return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("fork"))
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+
+#runs a function for every part and returns the total number of rows of each table
+def runParts(function, parts, arguments, workers, embedded):
+    pool = getPool(workers, embedded)
+    if pool == None:
+        results = [function(part, *arguments) for part in parts]
+    else:
+        futures = [pool.submit(function, part, *arguments) for part in parts]
+        results = [future.result() for future in futures]
+        pool.shutdown()
+    rows = {}
+    for result in results:
+        for table in result:
+            rows[table] = rows.get(table, 0) + result[table]
+    return rows
+
+#returns the name of the business database of a scale factor in a sweep, for example business_sf0_1
+def sweepDatabase(scale):
+    return "business_sf" + ("%g" % scale).replace(".", "_")
+
+""" recreates the tables of a business database and loads the TPC-H data of a scale factor
+    into it, generating and loading the parts of the tables in parallel, each over its own
+    connection, and then builds the keys and indexes. Returns the number of rows of each
+    table, the time of the load, and the (table, seconds) of every index build.
+"""
+def generateDatabase(database, scale, seed=1, chunkRows=50000, workers=os.cpu_count()):
+    began = time.time()
+    createTables(database)
+    rows = runParts(loadPart, getParts(scale, chunkRows, workers), (database, scale, seed, chunkRows), workers, isEmbedded())
+    seconds = time.time() - began
+    return rows, seconds, buildIndexes(database)
+
+#writes the .tbl files of a scale factor into a directory, generating the parts of the tables in
+#parallel and joining them in order, so the files are the same as if they were written one by one;
+#returns the number of rows of each table and the time it took
+def generateFiles(directory, scale, seed=1, chunkRows=50000, workers=os.cpu_count()):
+    began = time.time()
+    os.makedirs(directory, exist_ok=True)
+    parts = getParts(scale, chunkRows, workers)
+    rows = runParts(writePart, parts, (directory, scale, seed, chunkRows), workers, False)
+    for job in tableJobs:
+        for table in tableJobs[job]:
+            f = open(os.path.join(directory, table + ".tbl"), "w")
+            for part in parts:
+                if part[0] == job:
+                    name = os.path.join(directory, "{}.tbl.{}".format(table, part[1]))
+                    g = open(name, "r")
+                    f.write(g.read())
+                    g.close()
+                    os.remove(name)
+            f.close()
+    return rows, time.time() - began
@@ -0,0 +1,65 @@
+""" Description: This file computes order-insensitive checksums of query results, so that the results of the
+    queries with access control can be compared with a reference without keeping either of them in memory.
+    Each row is hashed on its own into a 64-bit number and the numbers are added together, so the checksum
+    of a result is the same whatever order its rows come in, and duplicate rows count as many times as they
+    appear. Numbers are compared to 10 significant digits, since a query that reads a view can add up the
+    same values in another order than one that does not. A reference result can have more columns than
+    the result that it is compared with (the selection items that were removed), so its rows are hashed
+    by the column names of the other result.
+"""
+
+import hashlib
+import datetime
+import decimal
+
+#returns a value as the text that is hashed
+def normalizeValue(value):
+    if isinstance(value, (float, decimal.Decimal)):
+        return "%.10g" % float(value)
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    return repr(value)
+
+#returns the 64-bit hash of a row's values
+def rowDigest(values):
+    text = "\x1f".join(normalizeValue(value) for value in values)
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "big")
+
+#the checksum of a result with the given column names, to which the rows are added one at a time
+class ResultChecksum:
+    def __init__(self, columns):
+        self.columns = list(columns)
+        self.rows = 0
+        self.total = 0
+
+    #adds a row to the checksum; if it has other columns, the positions of the checksum's columns are given
+    def add(self, row, positions=None):
+        if positions != None:
+            row = [row[p] for p in positions]
+        self.total = (self.total + rowDigest(row)) % (1 << 64)
+        self.rows += 1
+
+    def digest(self):
+        return "{:016x}".format(self.total)
+
+    #returns True if another checksum has the same columns, number of rows, and rows
+    def matches(self, other):
+        return self.columns == other.columns and self.rows == other.rows and self.total == other.total
+
+""" streams a result into a checksum with the given column names, which must all be columns
+    of the result; returns None if one of them is not, and the checksum otherwise. The result
+    should be executed with stream_results so that the rows are read from the server as they
+    are hashed; it is closed if it is not read, so that the connection can be used again.
+"""
+def streamChecksum(result, columns):
+    keys = list(result.keys())
+    positions = []
+    for column in columns:
+        if column not in keys:
+            result.close()
+            return None
+        positions.append(keys.index(column))
+    checksum = ResultChecksum(columns)
+    for row in result:
+        checksum.add(row, positions)
+    return checksum
@@ -0,0 +1,193 @@
+""" Description: This file reads and checks workload specifications for the policy generator. A workload
+    specification is a JSON (or YAML, if PyYAML is installed) file that describes the shape of a policy
+    dataset: the subjects, roles, and purposes, how popular each permission is, how many conditions and
+    environment attributes each policy has, and how many of the policies are noise. Together with its
+    seed, a specification describes one dataset exactly, so it is stored with the generated policies and
+    with the results of the runs that used it. Keys that are left out of a specification take the values
+    in defaultSpec, which resemble test case 3 of policies.py. The population key adds generated users,
+    roles, and purposes to the listed ones so that datasets with thousands of principals and many-to-many
+    role assignments can be described without listing every principal, and the hierarchy key arranges the
+roles into trees where each senior role inherits the permissions of its junior roles. The purposeTree
+key arranges the purposes into trees in the same way, where a sub-purpose is allowed everything that
+its parent purposes are allowed.
+"""
+
+import copy
+import hashlib
+import json
+import random
+
+#default workload specification
+defaultSpec = {"name": "default",
+               "seed": 0,
+               "policies": 100,
+               "noise": 0.0,
+               "subjects": ["Alice"],
+               "roles": ["CEO"],
+               "purposes": ["perform CEO tasks"],
+               "assignments": {"Alice": ["CEO"]},
+               "population": {"users": 0, "roles": 0, "purposes": 0, "rolesPerUser": {"1": 1}},
+               "hierarchy": {"depth": 0, "fanout": 2},
+               "purposeTree": {"depth": 0, "fanout": 2},
+               "coverage": 1.0,
+               "popularity": {"distribution": "uniform", "s": 1.0},
+               "conditions": {"0": 1, "1": 1, "2": 1, "3": 1},
+               "environment": {"cardinality": 4, "perPolicy": {"1": 1, "2": 1, "3": 1, "4": 1}}}
+
+#the environment attributes that the driver's abac check uses, followed by generated ones
+baseEnvironment = ["5/20/2020", "security 1", "morning", "hp laptop"]
+
+#reads a workload specification from a json or yaml file and fills in the missing keys
+def loadSpec(filename):
+    f = open(filename, "r")
+    if filename.endswith(".yaml") or filename.endswith(".yml"):
+        try:
+            import yaml
+        except ImportError:
+            f.close()
+            raise ValueError("PyYAML must be installed to read {}".format(filename))
+        spec = yaml.safe_load(f)
+    else:
+        spec = json.load(f)
+    f.close()
+    return completeSpec(spec)
+
+#returns a copy of the specification with the default values for any missing keys
+def completeSpec(spec):
+    complete = copy.deepcopy(defaultSpec)
+    for key in spec:
+        if key not in complete:
+            raise ValueError("unknown workload key: {}".format(key))
+        if isinstance(complete[key], dict) and key != "assignments":
+            complete[key].update(spec[key])
+        else:
+            complete[key] = spec[key]
+    checkSpec(complete)
+    return complete
+
+#raises a ValueError if the specification cannot be compiled into policies
+def checkSpec(spec):
+    if spec["policies"] < 0:
+        raise ValueError("the number of policies cannot be negative")
+    if spec["noise"] < 0 or spec["noise"] > 1:
+        raise ValueError("the noise ratio must be between 0 and 1")
+    if spec["coverage"] <= 0 or spec["coverage"] > 1:
+        raise ValueError("the coverage must be greater than 0 and at most 1")
+    population = spec["population"]
+    if not (spec["subjects"] or population["users"]) or not (spec["roles"] or population["roles"]) or not (spec["purposes"] or population["purposes"]):
+        raise ValueError("there must be at least one subject, role, and purpose")
+    for count in population["rolesPerUser"]:
+        if int(count) < 1 or int(count) > len(spec["roles"]) + population["roles"]:
+            raise ValueError("a user cannot have {} roles".format(count))
+    for key in ("hierarchy", "purposeTree"):
+        if spec[key]["depth"] < 0 or spec[key]["fanout"] < 1:
+            raise ValueError("the {} depth cannot be negative and the fanout must be at least 1".format(key))
+    if spec["popularity"]["distribution"] not in ("uniform", "zipf"):
+        raise ValueError("the popularity distribution must be uniform or zipf")
+    for subject in spec["assignments"]:
+        if subject not in spec["subjects"]:
+            raise ValueError("{} is assigned roles but is not a subject".format(subject))
+        for role in spec["assignments"][subject]:
+            if role not in spec["roles"]:
+                raise ValueError("{} is assigned to {} but is not a role".format(role, subject))
+    if spec["environment"]["cardinality"] < 1:
+        raise ValueError("there must be at least one environment attribute")
+    for count in spec["environment"]["perPolicy"]:
+        if int(count) < 1 or int(count) > spec["environment"]["cardinality"]:
+            raise ValueError("a policy cannot have {} environment attributes".format(count))
+
+#writes the specification to a json file
+def saveSpec(spec, filename):
+    f = open(filename, "w")
+    json.dump(spec, f, indent=4, sort_keys=True)
+    f.close()
+
+#returns a short hash that identifies the specification
+def specHash(spec):
+    return hashlib.sha1(json.dumps(spec, sort_keys=True).encode()).hexdigest()[:12]
+
+#returns the seeded random number generator for the specification
+def specRandom(spec):
+    return random.Random(spec["seed"])
+
+#returns the weight of each item given its popularity rank (0 is the most popular)
+def popularityWeights(spec, count):
+    if spec["popularity"]["distribution"] == "zipf":
+        s = spec["popularity"]["s"]
+        return [1.0 / ((rank + 1) ** s) for rank in range(count)]
+    return [1.0] * count
+
+#picks a count from a distribution given as a dictionary of count to weight
+def sampleCount(rng, distribution):
+    counts = [int(count) for count in distribution]
+    weights = [distribution[count] for count in distribution]
+    return rng.choices(counts, weights)[0]
+
+#returns the environment attributes of the specification
+def environmentAttributes(spec):
+    cardinality = spec["environment"]["cardinality"]
+    attributes = baseEnvironment[:cardinality]
+    for i in range(len(baseEnvironment), cardinality):
+        attributes.append("environment " + str(i))
+    return attributes
+
+""" returns the subjects, roles, purposes, and role assignments of the specification,
+    which are the listed ones followed by the generated population. Each generated user
+    is assigned a random number of distinct roles picked from the rolesPerUser
+    distribution. The population has its own seeded random number generator so that it
+    does not change the policies that are generated for the same seed.
+"""
+def expandPrincipals(spec):
+    rng = random.Random("{}-principals".format(spec["seed"]))
+    population = spec["population"]
+    subjects = list(spec["subjects"])
+    roles = list(spec["roles"])
+    purposes = list(spec["purposes"])
+    assignments = {}
+    for subject in spec["assignments"]:
+        assignments[subject] = list(spec["assignments"][subject])
+    for i in range(population["roles"]):
+        roles.append("role " + str(i))
+    for i in range(population["purposes"]):
+        purposes.append("purpose " + str(i))
+    for i in range(population["users"]):
+        subject = "user " + str(i)
+        subjects.append(subject)
+        assignments[subject] = rng.sample(roles, sampleCount(rng, population["rolesPerUser"]))
+    return subjects, roles, purposes, assignments
+
+#returns the purpose of each subject that its query stream is run with (see principals.csv); the purposes
+#have their own seeded random number generator, like the population, so that they do not change the policies
+def principalPurposes(spec, subjects, purposes):
+    rng = random.Random("{}-principal-purposes".format(spec["seed"]))
+    return dict([(subject, rng.choice(purposes)) for subject in subjects])
+
+""" returns the (parent, child) edges of trees of the given nodes. The nodes are
+    shuffled and placed into trees in order: each node becomes a child of the node before
+    it in the same tree until that node has fanout children, and a node that would be
+    deeper than the given depth starts a new tree. A depth of 0 gives no edges.
+"""
+def treeEdges(rng, nodes, depth, fanout):
+    order = list(nodes)
+    rng.shuffle(order)
+    edges = []
+    levels = []
+    for i in range(len(order)):
+        parent = (i - 1) // fanout
+        if i > 0 and levels[parent] < depth:
+            edges.append((order[parent], order[i]))
+            levels.append(levels[parent] + 1)
+        else:
+            levels.append(0)
+    return edges
+
+#returns the (senior, junior) edges of the role hierarchy of the specification; the hierarchy
+#has its own seeded random number generator like the population
+def expandHierarchy(spec, roles):
+    rng = random.Random("{}-hierarchy".format(spec["seed"]))
+    return treeEdges(rng, roles, spec["hierarchy"]["depth"], spec["hierarchy"]["fanout"])
+
+#returns the (parent, child) edges of the purpose trees of the specification
+def expandPurposeTree(spec, purposes):
+    rng = random.Random("{}-purposes".format(spec["seed"]))
+    return treeEdges(rng, purposes, spec["purposeTree"]["depth"], spec["purposeTree"]["fanout"])